@@ -7,7 +7,10 @@
     'description': """    """,
     'author': 'FV2573',
     'website': 'https://trandinh-fvict.github.io/',
-    'depends': ['base', 'web', 'mail'],
+    'depends': ['base', 'web', 'mail', 'bus'],
+    'external_dependencies': {
+        'python': ['numpy'],
+    },
     'data': [
         # Security
         'security/security.xml',
@@ -15,16 +18,21 @@
 
         # Data
         'data/sequences.xml',
+        'data/ir_cron.xml',
         # 'data/eval_questions.xml',
 
         # Views (load views with actions first, then menus)
         'views/teamconf_views.xml',
         'views/evaluation_views.xml',
+        'views/evaluation_total_views.xml',
+        'views/leaderboard_views.xml',
+        'views/report_job_views.xml',
+        'wizard/evaluation_campaign_views.xml',
         'views/templates.xml',
         'views/menus.xml',
 
         # Reports
-        # 'report/report_templates.xml',
+        'report/report_templates.xml',
     ],
     'demo': [],
     'installable': True,
@@ -34,7 +42,9 @@
     'assets': {
         'web.assets_frontend': [
             '/tpm_score_summary/static/src/css/evaluation_matrix.css',
+            '/tpm_score_summary/static/src/js/score_outbox.js',
             '/tpm_score_summary/static/src/js/evaluation_matrix.js',
+            '/tpm_score_summary/static/src/js/evaluation_matrix_live.js',
         ],
     },
 }
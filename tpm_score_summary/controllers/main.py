@@ -1,54 +1,76 @@
 # -*- coding: utf-8 -*-
 
+import hashlib
 import json
 import logging
-import time
-from collections import defaultdict
-from odoo import http, _
-from odoo.http import request
+from odoo import fields, http, _
+from odoo.http import request, content_disposition
 from odoo.exceptions import AccessError, ValidationError
 
-_logger = logging.getLogger(__name__)
+from ..models.evaluation import MATRIX_PAGE_SIZE, SUMMARY_SYNC_LIMIT
+from ..tools import route_metrics, summary_export
 
-# Rate limiting storage
-_rate_limit_storage = defaultdict(list)
-_rate_limit_window = 60  # seconds
-_rate_limit_max_requests = 100  # max requests per window (increased from 30)
+_logger = logging.getLogger(__name__)
 
 
 class VendorEvaluationController(http.Controller):
 
-    def _check_rate_limit(self, user_id):
+    def _check_rate_limit(self, user_id, route='save'):
         """
         Checks if a user has exceeded the rate limit for requests.
-        This function implements a simple rate limiting mechanism to prevent
-        abuse from rapid-fire requests. It tracks the number of requests made
-        by a user within a specific time window and blocks further requests if
-        the limit is exceeded.
+        This function implements a token bucket rate limiting mechanism to
+        prevent abuse from rapid-fire requests. The buckets are shared by all
+        the worker processes, and the limit of each route can be configured
+        with the `tpm_score_summary.rate_limit.<route>` system parameter.
         Args:
             user_id (int): The ID of the user to check.
+            route (str): The name of the rate limited route.
         Returns:
             bool: True if the user is within the rate limit, False otherwise.
         """
-        current_time = time.time()
-        user_requests = _rate_limit_storage[user_id]
-
-        # Remove old requests outside the window
-        _rate_limit_storage[user_id] = [
-            req_time for req_time in user_requests
-            if current_time - req_time < _rate_limit_window
-        ]
-
-        # Check if user has exceeded rate limit
-        if len(_rate_limit_storage[user_id]) >= _rate_limit_max_requests:
-            _logger.warning(f"Rate limit exceeded for user {user_id}: {len(_rate_limit_storage[user_id])} requests")
+        if not request.env['vem.rate.limit']._consume(route, user_id):
+            _logger.warning("Rate limit exceeded for user %s on route %s", user_id, route)
             return False
-
-        # Add current request
-        _rate_limit_storage[user_id].append(current_time)
         return True
 
+    def _conditional_render(self, freshness, render, *validator_parts):
+        """
+        Renders a page unless the browser already has its current version.
+        The page is validated by an ETag computed from the freshness of its
+        data, the user, the session (whose CSRF token is embedded in the
+        page), the language and the current month (displayed in the page
+        title). A matching `If-None-Match` request header is answered with
+        304 without rendering the page. No `Last-Modified` date is sent: the
+        `write_date` of the data is the start time of the transaction that
+        wrote it, which may precede a previous response.
+        Args:
+            freshness (tuple): The freshness of the displayed data, as
+                               returned by `vem.evaluation._get_data_freshness`.
+            render (callable): Returns the rendered response.
+            *validator_parts: Other values the content of the page depends on.
+        Returns:
+            odoo.http.Response: The rendered page or a 304 response.
+        """
+        today = fields.Date.context_today(request.env.user)
+        etag = hashlib.sha1(repr((
+            freshness, request.env.uid, request.session.sid, request.env.lang, today.strftime('%Y-%m'),
+            validator_parts,
+        )).encode()).hexdigest()
+
+        httprequest = request.httprequest
+        if httprequest.method in ('GET', 'HEAD') and httprequest.if_none_match.contains(etag):
+            response = request.make_response('', status=304)
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+
+        response = render()
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+
     @http.route('/vem/eval/<int:evaluation_id>', type='http', auth='user', website=True)
+    @route_metrics.instrumented('evaluation_matrix')
     def evaluation_matrix(self, evaluation_id, **kwargs):
         """
         Displays the evaluation matrix for a specific evaluation.
@@ -73,32 +95,8 @@ class VendorEvaluationController(http.Controller):
             # Check access rights - use only check_access for Odoo 18
             evaluation.check_access('read')
 
-            # Get all questions
-            questions = request.env['vem.eval.question'].search([('active', '=', True)], order='sequence, id')
-
-            # Prepare matrix data (question_id, vendor_id) -> line
-            matrix_data = {}
-            vendor_totals = {}
-
-            # Initialize vendor totals
-            for vendor in evaluation.vendor_ids:
-                vendor_totals[vendor.id] = 0
-
-            # Populate matrix data and calculate totals
-            for line in evaluation.line_ids:
-                key = (line.question_id.id, line.vendor_id.id)
-                matrix_data[key] = line
-                vendor_totals[line.vendor_id.id] += line.score
-
-            # Prepare template values
-            values = {
-                'evaluation': evaluation,
-                'questions': questions,
-                'matrix_data': matrix_data,
-                'vendor_totals': vendor_totals,
-            }
-
-            return request.render('tpm_score_summary.evaluation_matrix_template', values)
+            __, freshness = evaluation._get_data_freshness(evaluation.ids)
+            return self._conditional_render(freshness, lambda: self._render_evaluation_matrix(evaluation))
 
         except AccessError:
             return request.render('http_routing.403')
@@ -106,103 +104,143 @@ class VendorEvaluationController(http.Controller):
             _logger.error("Error displaying evaluation matrix: %s", str(e))
             return request.render('http_routing.404')
 
+    def _render_evaluation_matrix(self, evaluation):
+        """
+        Renders the evaluation matrix template of an evaluation.
+        Only the team headers, the totals and the first page of rows are
+        sent with the page. The browser renders the visible rows and loads
+        the other pages from `/vem/eval/<id>/rows` while scrolling, so the
+        size of the page does not depend on the number of questions.
+        Args:
+            evaluation (recordset): The evaluation to display.
+        Returns:
+            odoo.http.Response: The rendered evaluation matrix template.
+        """
+        first_page = evaluation._load_matrix_rows()
+
+        # Prepare template values
+        values = {
+            'evaluation': evaluation,
+            'vendors': evaluation.vendor_ids,
+            'vendor_totals': evaluation._get_vendor_totals(),
+            'row_count': first_page['total'],
+            'page_size': MATRIX_PAGE_SIZE,
+            'first_page': json.dumps(first_page),
+        }
+
+        return request.render('tpm_score_summary.evaluation_matrix_template', values)
+
+    @http.route('/vem/eval/<int:evaluation_id>/matrix', type='json', auth='user', methods=['POST'])
+    @route_metrics.instrumented('matrix')
+    def evaluation_matrix_data(self, evaluation_id, **kwargs):
+        """
+        Returns the evaluation matrix as JSON.
+        This function provides the same data as the evaluation matrix page,
+        so the browser can render or refresh the grid without reloading the
+        page.
+        Args:
+            evaluation_id (int): The ID of the evaluation.
+            **kwargs: Additional keyword arguments.
+        Returns:
+            dict: A JSON response containing the matrix data.
+        """
+        try:
+            evaluation = request.env['vem.evaluation'].browse(evaluation_id)
+
+            if not evaluation.exists():
+                return {'success': False, 'error': 'Evaluation not found'}
+
+            evaluation.check_access('read')
+
+            return {'success': True, 'matrix': evaluation._get_matrix_payload()}
+
+        except AccessError:
+            return {'success': False, 'error': 'Access denied'}
+        except Exception as e:
+            _logger.error("Error loading evaluation matrix: %s", str(e))
+            return {'success': False, 'error': 'Internal server error'}
+
+    @http.route('/vem/eval/<int:evaluation_id>/rows', type='json', auth='user', methods=['POST'])
+    @route_metrics.instrumented('rows')
+    def evaluation_matrix_rows(self, evaluation_id, offset=0, limit=MATRIX_PAGE_SIZE, **kwargs):
+        """
+        Returns a page of rows of the evaluation matrix as JSON.
+        This function lets the browser load the rows of large matrices
+        while they are scrolled into view.
+        Args:
+            evaluation_id (int): The ID of the evaluation.
+            offset (int): The position of the first question of the page.
+            limit (int): The number of questions of the page.
+            **kwargs: Additional keyword arguments.
+        Returns:
+            dict: A JSON response containing the rows of the page.
+        """
+        try:
+            evaluation = request.env['vem.evaluation'].browse(evaluation_id)
+
+            if not evaluation.exists():
+                return {'success': False, 'error': 'Evaluation not found'}
+
+            evaluation.check_access('read')
+
+            return {'success': True, **evaluation._load_matrix_rows(max(0, int(offset)), int(limit))}
+
+        except AccessError:
+            return {'success': False, 'error': 'Access denied'}
+        except (TypeError, ValueError):
+            return {'success': False, 'error': 'Invalid page'}
+        except Exception as e:
+            _logger.error("Error loading evaluation matrix rows: %s", str(e))
+            return {'success': False, 'error': 'Internal server error'}
+
     @http.route('/vem/eval/<int:evaluation_id>/save', type='json', auth='user', methods=['POST'])
+    @route_metrics.instrumented('save')
     def save_evaluation_score(self, evaluation_id, **kwargs):
         """
         Saves or updates a single evaluation score.
         This function handles the saving of a score for a specific question
-        and vendor in an evaluation. It performs rate limiting, validation,
-        and access control checks before creating or updating the evaluation
-        line.
+        and vendor in an evaluation. It performs rate limiting and hands the
+        cell to the score service, which validates it, checks the access
+        rights and creates or updates the evaluation line.
         Args:
             evaluation_id (int): The ID of the evaluation.
             **kwargs: A dictionary containing the question_id, vendor_id, and
                       score.
         Returns:
             dict: A JSON response indicating the success or failure of the
-                  operation, along with the updated vendor totals.
+                  operation, along with the updated total of the vendor.
         """
         try:
             # Rate limiting check
             if not self._check_rate_limit(request.env.user.id):
-                return {'success': False, 'error': 'Too many requests, please try again later'}
+                return {'success': False, 'error': 'Too many requests, please try again later', 'retry': True}
 
-            # Get the evaluation record
-            evaluation = request.env['vem.evaluation'].browse(evaluation_id)
-
-            if not evaluation.exists():
-                return {'success': False, 'error': 'Evaluation not found'}
-
-            # Check if evaluation is in draft state
-            if evaluation.state != 'draft':
-                return {'success': False, 'error': 'Cannot modify evaluation in current state'}
-
-            # Check access rights - use only check_access for Odoo 18
-            evaluation.check_access('write')
-
-            # Get request data
             question_id = kwargs.get('question_id')
             vendor_id = kwargs.get('vendor_id')
             score = kwargs.get('score')
-            line_id = kwargs.get('line_id', 0)
 
-            _logger.info(
-                f"Saving score: evaluation_id={evaluation_id}, question_id={question_id}, vendor_id={vendor_id}, score={score}")
+            _logger.debug(
+                "Saving score: evaluation_id=%s, question_id=%s, vendor_id=%s, score=%s",
+                evaluation_id, question_id, vendor_id, score)
 
             # Validate input
             if not all([question_id, vendor_id]) or score is None:
                 return {'success': False, 'error': 'Missing required parameters'}
 
-            # Enhanced score validation
-            try:
-                score_int = int(score)
-            except (ValueError, TypeError):
-                return {'success': False, 'error': 'Score must be a valid integer'}
-
-            if not (1 <= score_int <= 5):
-                return {'success': False, 'error': 'Score must be between 1 and 5'}
-
-            # Check if vendor is in evaluation
-            if int(vendor_id) not in evaluation.vendor_ids.ids:
-                return {'success': False, 'error': 'Vendor not in evaluation'}
-
-            # Find or create evaluation line
-            line_domain = [
-                ('evaluation_id', '=', evaluation_id),
-                ('question_id', '=', int(question_id)),
-                ('vendor_id', '=', int(vendor_id))
-            ]
-
-            line = request.env['vem.evaluation.line'].search(line_domain, limit=1)
-
-            if line:
-                # Update existing line
-                line.write({'score': int(score)})
-                _logger.info(f"Updated existing line {line.id} with score {score}")
-            else:
-                # Create new line
-                line = request.env['vem.evaluation.line'].create({
-                    'evaluation_id': evaluation_id,
-                    'question_id': int(question_id),
-                    'vendor_id': int(vendor_id),
-                    'score': int(score)
-                })
-                _logger.info(f"Created new line {line.id} with score {score}")
-
-            # Recalculate vendor totals
-            vendor_totals = {}
-            for vendor in evaluation.vendor_ids:
-                total = sum(evaluation.line_ids.filtered(
-                    lambda l: l.vendor_id.id == vendor.id
-                ).mapped('score'))
-                vendor_totals[vendor.id] = total
-
-            _logger.info(f"Vendor totals: {vendor_totals}")
+            result = request.env['vem.score.service']._save_scores(evaluation_id, [{
+                'question_id': question_id, 'vendor_id': vendor_id, 'score': score,
+            }])
+            if not result['success']:
+                return result
+            if result['errors']:
+                return {'success': False, 'error': result['errors'][0]['error']}
 
+            line = result['lines'][0]
             return {
                 'success': True,
-                'line_id': line.id,
-                'vendor_totals': vendor_totals
+                'line_id': line['line_id'],
+                'version': line['version'],
+                'vendor_totals': result['vendor_totals']
             }
 
         except AccessError:
@@ -211,7 +249,46 @@ class VendorEvaluationController(http.Controller):
             _logger.error("Error saving evaluation score: %s", str(e))
             return {'success': False, 'error': f'Internal server error: {str(e)}'}
 
+    @http.route('/vem/eval/<int:evaluation_id>/save_batch', type='json', auth='user', methods=['POST'])
+    @route_metrics.instrumented('save_batch')
+    def save_evaluation_scores(self, evaluation_id, cells=None, **kwargs):
+        """
+        Saves or updates many evaluation scores at once.
+        This function lets the matrix coalesce its pending edits into a
+        single request. All the valid cells are persisted by the score
+        service with one upsert statement and the vendor totals are updated
+        once for the whole batch.
+        Args:
+            evaluation_id (int): The ID of the evaluation.
+            cells (list): A list of dictionaries containing the question_id,
+                          vendor_id and score of each cell, and optionally
+                          the version of the line the score was based on.
+            **kwargs: Additional keyword arguments.
+        Returns:
+            dict: A JSON response with the saved lines, the cells that were
+                  rejected, and the updated vendor totals. Cells rejected
+                  because their line changed since the given version come
+                  with the current state of the line. A rate limited
+                  request is answered with `retry` set, so the matrix sends
+                  it again later.
+        """
+        try:
+            if not self._check_rate_limit(request.env.user.id, 'save_batch'):
+                return {'success': False, 'error': 'Too many requests, please try again later', 'retry': True}
+
+            if not isinstance(cells, list):
+                return {'success': False, 'error': 'Missing required parameters'}
+
+            return request.env['vem.score.service']._save_scores(evaluation_id, cells)
+
+        except AccessError:
+            return {'success': False, 'error': 'Access denied'}
+        except Exception as e:
+            _logger.error("Error saving evaluation scores: %s", str(e))
+            return {'success': False, 'error': f'Internal server error: {str(e)}'}
+
     @http.route('/vem/eval/<int:evaluation_id>/submit', type='json', auth='user', methods=['POST'])
+    @route_metrics.instrumented('submit')
     def submit_evaluation(self, evaluation_id, **kwargs):
         """
         Submits an evaluation for approval.
@@ -253,6 +330,7 @@ class VendorEvaluationController(http.Controller):
             return {'success': False, 'error': 'Internal server error'}
 
     @http.route('/vem/eval/<int:evaluation_id>/approve', type='json', auth='user', methods=['POST'])
+    @route_metrics.instrumented('approve')
     def approve_evaluation(self, evaluation_id, **kwargs):
         """
         Approves an evaluation.
@@ -295,13 +373,17 @@ class VendorEvaluationController(http.Controller):
             return {'success': False, 'error': 'Internal server error'}
 
     @http.route('/vem/tpm_summary', type='http', auth='user', website=True, methods=['GET', 'POST'])
+    @route_metrics.instrumented('tpm_summary')
     def tpm_evaluation_summary(self, **kwargs):
         """
         Displays a summary of multiple TPM evaluations.
         This function retrieves the summary data for a list of evaluations and
         renders a template to display the information. It performs access
         control checks to ensure that the user has the right to view the
-        evaluations.
+        evaluations. Summaries of more than `SUMMARY_SYNC_LIMIT` evaluations
+        are queued as a background report job instead; a pending job of the
+        user for the same evaluations is reused, so reloading or sharing the
+        page does not queue the report again.
         Args:
             **kwargs: A dictionary containing the 'evaluation_ids' as a
                       comma-separated string.
@@ -330,14 +412,141 @@ class VendorEvaluationController(http.Controller):
             except AccessError:
                 return request.render('http_routing.403')
 
-            # Get multi-evaluation summary data
-            summary_data = request.env['vem.evaluation'].get_multi_evaluation_summary(evaluation_ids)
+            # Large summaries would exceed the time limit of the worker
+            if len(evaluation_ids) > SUMMARY_SYNC_LIMIT:
+                request.env['vem.report.job']._enqueue(evaluations.exists())
+                return request.redirect('/odoo/action-tpm_score_summary.action_report_job')
+
+            data_freshness = evaluations._get_data_freshness(evaluation_ids)
+            __, freshness = data_freshness
 
-            return request.render('tpm_score_summary.multi_summary_template', {
-                'summary_data': summary_data,
-                'evaluations': evaluations,
-            })
+            def render():
+                # Get multi-evaluation summary data
+                summary_data = request.env['vem.evaluation'].get_multi_evaluation_summary(
+                    evaluation_ids, data_freshness=data_freshness)
+
+                return request.render('tpm_score_summary.multi_summary_template', {
+                    'summary_data': summary_data,
+                    'evaluations': evaluations,
+                })
+
+            return self._conditional_render(freshness, render, tuple(evaluation_ids))
 
         except Exception as e:
             _logger.error(f"Error rendering TPM evaluation summary: {str(e)}")
             return request.render('http_routing.404')
+
+    @http.route('/vem/tpm_summary/export', type='http', auth='user', methods=['GET'])
+    @route_metrics.instrumented('tpm_summary_export')
+    def tpm_evaluation_summary_export(self, evaluation_ids='', file_format='csv', **kwargs):
+        """
+        Exports the scores of multiple TPM evaluations as CSV or XLSX.
+        The response is streamed: the (evaluation, evaluator, question, team,
+        score) rows are read from a server-side cursor and written to the
+        file chunk by chunk, so large exports do not grow the memory of the
+        worker.
+        Args:
+            evaluation_ids (str): A comma-separated list of evaluation IDs.
+            file_format (str): Either 'csv' or 'xlsx'.
+            **kwargs: Additional keyword arguments.
+        Returns:
+            odoo.http.Response: The streamed file.
+        """
+        try:
+            evaluation_ids = [int(x) for x in evaluation_ids.split(',') if x.strip()]
+            evaluations = request.env['vem.evaluation'].browse(evaluation_ids).exists()
+
+            if not evaluations or file_format not in ('csv', 'xlsx'):
+                return request.not_found()
+
+            evaluations.check_access('read')
+
+        except AccessError:
+            return request.render('http_routing.403')
+        except ValueError:
+            return request.not_found()
+
+        registry = request.env.registry
+        export_ids = evaluations.ids
+        if file_format == 'xlsx':
+            writer = summary_export.stream_xlsx
+            content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        else:
+            writer = summary_export.stream_csv
+            content_type = 'text/csv; charset=utf-8'
+
+        def generate():
+            # The request cursor is closed once the response is returned,
+            # so the rows are read on a cursor of their own
+            with registry.cursor() as cr:
+                rows = summary_export.iter_summary_rows(cr, export_ids)
+                try:
+                    yield from writer(rows)
+                finally:
+                    rows.close()
+
+        return request.make_response(generate(), headers=[
+            ('Content-Type', content_type),
+            ('Content-Disposition', content_disposition(f'tpm_summary.{file_format}')),
+        ])
+
+    @http.route('/vem/tpm_summary/stats', type='json', auth='user', methods=['POST'])
+    @route_metrics.instrumented('tpm_summary_stats')
+    def tpm_evaluation_stats(self, evaluation_ids=None, **kwargs):
+        """
+        Returns the statistics of multiple TPM evaluations as JSON.
+        This includes, per team, the mean, median, standard deviation, min,
+        max and rank of the evaluator totals, the min and max score of each
+        question, and the agreement between evaluators (Kendall's W).
+        Args:
+            evaluation_ids (list): The IDs of the evaluations, as a list or a
+                                   comma-separated string.
+            **kwargs: Additional keyword arguments.
+        Returns:
+            dict: A JSON response containing the statistics.
+        """
+        try:
+            if isinstance(evaluation_ids, str):
+                evaluation_ids = [int(x) for x in evaluation_ids.split(',') if x.strip()]
+
+            if not evaluation_ids:
+                return {'success': False, 'error': 'Missing required parameters'}
+
+            evaluations = request.env['vem.evaluation'].browse(evaluation_ids).exists()
+
+            if not evaluations:
+                return {'success': False, 'error': 'Evaluation not found'}
+
+            evaluations.check_access('read')
+
+            return {
+                'success': True,
+                **request.env['vem.evaluation'].get_multi_evaluation_stats(evaluations.ids),
+            }
+
+        except AccessError:
+            return {'success': False, 'error': 'Access denied'}
+        except Exception as e:
+            _logger.error("Error computing TPM evaluation statistics: %s", str(e))
+            return {'success': False, 'error': 'Internal server error'}
+
+    @http.route('/vem/metrics', type='json', auth='user', methods=['POST'])
+    def evaluation_route_metrics(self, reset=False, **kwargs):
+        """
+        Returns the timing and SQL metrics of the evaluation routes.
+        The metrics are aggregated in memory by each worker process, so they
+        cover the requests served by the worker answering this request.
+        This endpoint is restricted to users with the 'manager' role.
+        Args:
+            reset (bool): Whether to discard the metrics after reading them.
+            **kwargs: Additional keyword arguments.
+        Returns:
+            dict: A JSON response containing the metrics per route.
+        """
+        if not request.env.user.has_group('tpm_score_summary.group_vem_manager'):
+            return {'success': False, 'error': 'Access denied'}
+
+        metrics = route_metrics.snapshot()
+        if reset:
+            route_metrics.reset()
+        return {'success': True, 'enabled': route_metrics.is_enabled(), **metrics}
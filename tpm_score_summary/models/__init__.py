@@ -2,3 +2,9 @@
 
 from . import vendor
 from . import evaluation
+from . import evaluation_total
+from . import score_service
+from . import rate_limit
+from . import ir_websocket
+from . import leaderboard
+from . import report_job
@@ -1,8 +1,42 @@
 # -*- coding: utf-8 -*-
 
-from odoo import models, fields, api
+from odoo import models, fields, api, Command
 from odoo.exceptions import ValidationError, UserError
-import json
+from odoo.tools import split_every
+from odoo.tools.lru import LRU
+import logging
+from collections import defaultdict
+
+import numpy as np
+
+from ..tools import score_stats
+from .evaluation_total import SCORE_MAX
+
+_logger = logging.getLogger(__name__)
+
+# Computed multi-evaluation summaries, keyed by database, evaluation IDs and
+# freshness of their data
+SUMMARY_CACHE_SIZE = 32
+_summary_cache = LRU(SUMMARY_CACHE_SIZE)
+
+CAMPAIGN_BATCH_SIZE = 50000  # evaluation lines inserted per statement
+MATRIX_PAGE_SIZE = 50  # question rows of the evaluation matrix loaded at once
+MATRIX_MAX_PAGE_SIZE = 200
+# Summaries of more evaluations are generated in the background
+SUMMARY_SYNC_LIMIT = 50
+
+
+def _positions(keys, values):
+    """
+    Returns the position of each value in an array of unique keys.
+    Args:
+        keys (numpy.ndarray): The unique keys.
+        values (numpy.ndarray): Values that all exist in the keys.
+    Returns:
+        numpy.ndarray: The index in `keys` of each value.
+    """
+    order = np.argsort(keys)
+    return order[np.searchsorted(keys, values, sorter=order)]
 
 
 class VendorEvalQuestion(models.Model):
@@ -30,6 +64,47 @@ class VendorEvalQuestion(models.Model):
         default=True,
         help='Set to false to archive the question'
     )
+    weight = fields.Float(
+        string='Weight',
+        digits=(16, 2),
+        default=1.0,
+        required=True,
+        help='Weight of the scores of the question in the weighted totals and percentages'
+    )
+
+    _sql_constraints = [
+        ('weight_positive', 'CHECK(weight > 0)', 'The weight of a question must be positive!')
+    ]
+
+    def write(self, vals):
+        """
+        Overrides the write method to recompute the weighted totals of the
+        evaluations having lines of the questions whose weight changes, and
+        to refresh the leaderboard computed from these totals.
+        Args:
+            vals (dict): The values to write.
+        Returns:
+            bool: True
+        """
+        res = super().write(vals)
+        if 'weight' in vals:
+            groups = self.env['vem.evaluation.line']._read_group([('question_id', 'in', self.ids)], ['evaluation_id'])
+            if groups:
+                self.env['vem.evaluation.total']._rebuild([evaluation.id for evaluation, in groups])
+                self.env['vem.team.leaderboard']._trigger_refresh()
+        return res
+
+    @api.model
+    def _get_weights(self, question_ids):
+        """
+        Returns the weights of some questions, including archived ones.
+        Args:
+            question_ids (iterable): The IDs of the questions.
+        Returns:
+            dict: The weight keyed by question ID.
+        """
+        questions = self.with_context(active_test=False).browse(list(question_ids))
+        return {question.id: question.weight for question in questions}
 
 
 class VendorEvaluation(models.Model):
@@ -60,6 +135,9 @@ class VendorEvaluation(models.Model):
     )
     vendor_ids = fields.Many2many(
         'vem.vendor',
+        'vem_evaluation_vem_vendor_rel',
+        'vem_evaluation_id',
+        'vem_vendor_id',
         string='Team to Evaluate',
         required=True,
         help='Select Team to be evaluated'
@@ -77,12 +155,21 @@ class VendorEvaluation(models.Model):
     create_date = fields.Datetime(string='Creation Date', readonly=True)
     submit_date = fields.Datetime(string='Submit Date', readonly=True)
     approve_date = fields.Datetime(string='Approve Date', readonly=True)
+    revision = fields.Integer(
+        string='Revision',
+        default=0,
+        readonly=True,
+        copy=False,
+        help='Incremented on every change of the evaluation, so cached '
+             'summaries and pages of the evaluation can detect it'
+    )
 
-    total_scores = fields.Text(
-        string='Total Scores JSON',
-        compute='_compute_total_scores',
-        store=True,
-        help='JSON storage of total scores by FV'
+    total_ids = fields.One2many(
+        'vem.evaluation.total',
+        'evaluation_id',
+        string='Team Totals',
+        readonly=True,
+        help='Total, weighted and percentage scores of each team'
     )
 
     line_count = fields.Integer(
@@ -103,32 +190,122 @@ class VendorEvaluation(models.Model):
         Returns:
             recordset: The newly created evaluation records.
         """
-        for vals in vals_list:
-            if vals.get('name', ' ') == ' ':
-                vals['name'] = self.env['ir.sequence'].next_by_code('vem.evaluation') or ' '
+        unnamed = [vals for vals in vals_list if vals.get('name', ' ') == ' ']
+        for vals, name in zip(unnamed, self._next_sequence_names(len(unnamed))):
+            vals['name'] = name or ' '
         return super().create(vals_list)
 
-    @api.depends('line_ids.score')
-    def _compute_total_scores(self):
+    def write(self, vals):
         """
-        Computes the total scores for each vendor in the evaluation and stores
-        them as a JSON string.
-        This method calculates the total score, max possible score, and the
-        percentage score for each vendor and stores the result in the
-        `total_scores` field.
+        Overrides the write method to increment the revision of the
+        evaluations, whose state, name or vendors may change.
+        Args:
+            vals (dict): The values to write.
+        Returns:
+            bool: True
         """
-        for evaluation in self:
-            totals = {}
-            for vendor in evaluation.vendor_ids:
-                lines = evaluation.line_ids.filtered(lambda l: l.vendor_id.id == vendor.id)
-                total_score = sum(lines.mapped('score'))
-                totals[vendor.id] = {
-                    'vendor_name': vendor.name,
-                    'total_score': total_score,
-                    'max_score': len(evaluation.line_ids.mapped('question_id')) * 5 if evaluation.line_ids else 85,
-                    'percentage': round((total_score / 85) * 100, 2) if total_score > 0 else 0
-                }
-            evaluation.total_scores = json.dumps(totals)
+        res = super().write(vals)
+        if self:
+            self.flush_recordset(['revision'])
+            self.env.cr.execute("UPDATE vem_evaluation SET revision = revision + 1 WHERE id = ANY(%s)",
+                                [self.ids])
+            self.invalidate_recordset(['revision'])
+        return res
+
+    @api.model
+    def _next_sequence_names(self, count):
+        """
+        Allocates many evaluation numbers from the 'vem.evaluation' sequence
+        at once.
+        The numbers of a standard sequence are drawn from its PostgreSQL
+        sequence with a single `nextval` query, and those of a no-gap
+        sequence with a single update of its counter, instead of one
+        `next_by_code` call per evaluation.
+        Args:
+            count (int): The number of evaluation numbers to allocate.
+        Returns:
+            list: The evaluation numbers, or False values when the sequence
+                  does not exist.
+        """
+        if not count:
+            return []
+
+        sequence = self.env['ir.sequence'].sudo().search([
+            ('code', '=', 'vem.evaluation'),
+            ('company_id', 'in', [self.env.company.id, False]),
+        ], order='company_id', limit=1)
+        if not sequence:
+            return [False] * count
+        if sequence.use_date_range:
+            return [sequence.next_by_id() for __ in range(count)]
+
+        if sequence.implementation == 'standard':
+            self.env.cr.execute("SELECT nextval(%s) FROM generate_series(1, %s)",
+                                ['ir_sequence_%03d' % sequence.id, count])
+            numbers = [number for number, in self.env.cr.fetchall()]
+        else:
+            sequence.flush_recordset(['number_next'])
+            self.env.cr.execute("""
+                UPDATE ir_sequence
+                   SET number_next = number_next + %(count)s * number_increment
+                 WHERE id = %(id)s
+             RETURNING number_next - %(count)s * number_increment, number_increment
+            """, {'id': sequence.id, 'count': count})
+            first, increment = self.env.cr.fetchone()
+            sequence.invalidate_recordset(['number_next'])
+            numbers = [first + index * increment for index in range(count)]
+        return [sequence.get_next_char(number) for number in numbers]
+
+    @api.model
+    def _create_campaign(self, evaluator_names, vendors, questions=None):
+        """
+        Creates one evaluation per evaluator with all its lines.
+        The evaluations are created with a single batch `create` and their
+        lines for every question and vendor are inserted in batches of
+        `CAMPAIGN_BATCH_SIZE`, so launching a campaign of hundreds of
+        evaluators does not create the lines one record at a time nor wait
+        for each evaluation to be opened.
+        Args:
+            evaluator_names (list): The names of the evaluators.
+            vendors (recordset): The teams evaluated by every evaluator.
+            questions (recordset): The questions of the evaluations. Defaults
+                                   to the active questions.
+        Returns:
+            recordset: The created evaluations.
+        """
+        if questions is None:
+            questions = self.env['vem.eval.question'].search([('active', '=', True)])
+
+        evaluations = self.create([{
+            'evaluator_name': evaluator_name,
+            'vendor_ids': [Command.set(vendors.ids)],
+        } for evaluator_name in evaluator_names])
+
+        keys = (
+            (evaluation_id, question_id, vendor_id)
+            for evaluation_id in evaluations.ids
+            for question_id in questions.ids
+            for vendor_id in vendors.ids
+        )
+        for batch in split_every(CAMPAIGN_BATCH_SIZE, keys, list):
+            self.env['vem.evaluation.line']._insert_lines(evaluations, batch)
+        _logger.info("Created a campaign of %s evaluations for %s teams and %s questions",
+                     len(evaluations), len(vendors), len(questions))
+        return evaluations
+
+    @api.model
+    def _get_total_percentage(self, weighted_score, max_score):
+        """
+        Returns the percentage of a weighted score over the max score.
+        This is the Python counterpart of the percentage computed in SQL,
+        used to combine the totals of several evaluations.
+        Args:
+            weighted_score (float): The weighted score of a vendor.
+            max_score (float): The max weighted score of the vendor.
+        Returns:
+            float: The percentage score.
+        """
+        return round(weighted_score * 100 / max_score, 2) if max_score > 0 else 0.0
 
     @api.depends('line_ids')
     def _compute_line_count(self):
@@ -154,35 +331,198 @@ class VendorEvaluation(models.Model):
         """
         Creates evaluation lines for all combinations of questions and vendors.
         This method ensures that an evaluation line exists for each active
-        question and each selected vendor. It only creates lines that do not
-        already exist, preserving any existing scores.
+        question and each selected vendor of every evaluation in the
+        recordset. It only creates lines that do not already exist,
+        preserving any existing scores: the missing (question, vendor) pairs
+        are the set difference between the expected pairs and the existing
+        ones, read with one query, and they are inserted in bulk.
         """
-        if not self.vendor_ids:
+        evaluations = self.filtered(lambda evaluation: evaluation._origin.id and evaluation.vendor_ids)
+        if not evaluations:
             return
 
         # Get all questions
-        questions = self.env['vem.eval.question'].search([('active', '=', True)])
+        question_ids = self.env['vem.eval.question'].search([('active', '=', True)]).ids
+
+        evaluation_ids = [evaluation._origin.id for evaluation in evaluations]
+        self.env['vem.evaluation.line'].flush_model(['evaluation_id', 'question_id', 'vendor_id'])
+        self.env.cr.execute("""
+            SELECT evaluation_id, question_id, vendor_id
+              FROM vem_evaluation_line
+             WHERE evaluation_id = ANY(%s)
+        """, [evaluation_ids])
+        existing = set(self.env.cr.fetchall())
 
         # Only create missing lines, don't remove existing ones
-        lines_to_create = []
-        for question in questions:
-            for vendor in self.vendor_ids:
-                # Check if line already exists
-                existing_line = self.line_ids.filtered(
-                    lambda l: l.question_id.id == question.id and l.vendor_id.id == vendor.id
-                )
-
-                # Only create if line doesn't exist
-                if not existing_line:
-                    lines_to_create.append({
-                        'evaluation_id': self.id,
-                        'question_id': question.id,
-                        'vendor_id': vendor.id,
-                        'score': 1,  # Default score
-                    })
-
-        if lines_to_create:
-            self.env['vem.evaluation.line'].create(lines_to_create)
+        missing = [
+            (evaluation._origin.id, question_id, vendor_id)
+            for evaluation in evaluations
+            for question_id in question_ids
+            for vendor_id in evaluation.vendor_ids.ids
+        ]
+        missing = [key for key in missing if key not in existing]
+        if missing:
+            stored = self.browse(evaluation_ids)
+            self.env['vem.evaluation.line']._insert_lines(stored, missing)
+
+    def _load_matrix(self, questions=None):
+        """
+        Loads the scores of the evaluation matrix with a single query.
+        The scores are returned as a dense array indexed by the position of
+        the question and of the vendor, so rendering a cell does not require
+        any lookup on records.
+        Args:
+            questions (recordset): The questions of the matrix rows. Defaults
+                                   to the active questions.
+        Returns:
+            dict: A dictionary containing the question and vendor IDs in
+                  display order, the cells as [line_id, score] pairs (or None
+                  when the line does not exist), and the total score of each
+                  vendor.
+        """
+        self.ensure_one()
+        if questions is None:
+            questions = self.env['vem.eval.question'].search([('active', '=', True)], order='sequence, id')
+
+        question_ids = questions.ids
+        vendor_ids = self.vendor_ids.ids
+        question_index = {question_id: index for index, question_id in enumerate(question_ids)}
+        vendor_index = {vendor_id: index for index, vendor_id in enumerate(vendor_ids)}
+        cells = [[None] * len(vendor_ids) for __ in question_ids]
+        vendor_totals = dict.fromkeys(vendor_ids, 0)
+
+        self.env['vem.evaluation.line'].flush_model(['evaluation_id', 'question_id', 'vendor_id', 'score'])
+        self.env.cr.execute("""
+            SELECT question_id, vendor_id, id, score
+              FROM vem_evaluation_line
+             WHERE evaluation_id = %s
+        """, [self.id])
+        for question_id, vendor_id, line_id, score in self.env.cr.fetchall():
+            column = vendor_index.get(vendor_id)
+            if column is None:
+                continue
+            vendor_totals[vendor_id] += score
+            row = question_index.get(question_id)
+            if row is not None:
+                cells[row][column] = [line_id, score]
+
+        return {
+            'question_ids': question_ids,
+            'vendor_ids': vendor_ids,
+            'cells': cells,
+            'vendor_totals': vendor_totals,
+        }
+
+    def _load_matrix_rows(self, offset=0, limit=MATRIX_PAGE_SIZE):
+        """
+        Loads a page of rows of the evaluation matrix.
+        Only the lines of the questions of the page are read, so the cost of
+        loading a page does not depend on the size of the matrix.
+        Args:
+            offset (int): The position of the first question of the page.
+            limit (int): The number of questions of the page, at most
+                         `MATRIX_MAX_PAGE_SIZE`.
+        Returns:
+            dict: A dictionary containing the offset of the page, the total
+                  number of rows, the vendor IDs in column order, and the
+                  rows, each with the question ID and name and its cells as
+                  [line_id, score, version] lists (or None when the line
+                  does not exist).
+        """
+        self.ensure_one()
+        domain = [('active', '=', True)]
+        limit = max(1, min(limit, MATRIX_MAX_PAGE_SIZE))
+        questions = self.env['vem.eval.question'].search(domain, order='sequence, id', offset=offset, limit=limit)
+
+        vendor_ids = self.vendor_ids.ids
+        question_index = {question_id: index for index, question_id in enumerate(questions.ids)}
+        vendor_index = {vendor_id: index for index, vendor_id in enumerate(vendor_ids)}
+        cells = [[None] * len(vendor_ids) for __ in questions]
+
+        self.env['vem.evaluation.line'].flush_model(['evaluation_id', 'question_id', 'vendor_id', 'score', 'version'])
+        self.env.cr.execute("""
+            SELECT question_id, vendor_id, id, score, version
+              FROM vem_evaluation_line
+             WHERE evaluation_id = %s
+               AND question_id = ANY(%s)
+        """, [self.id, questions.ids])
+        for question_id, vendor_id, line_id, score, version in self.env.cr.fetchall():
+            column = vendor_index.get(vendor_id)
+            if column is not None:
+                cells[question_index[question_id]][column] = [line_id, score, version]
+
+        return {
+            'offset': offset,
+            'total': self.env['vem.eval.question'].search_count(domain),
+            'vendor_ids': vendor_ids,
+            'rows': [
+                {'question_id': question.id, 'question_name': question.name, 'cells': cells[index]}
+                for index, question in enumerate(questions)
+            ],
+        }
+
+    def _get_vendor_totals(self):
+        """
+        Returns the total score of each vendor of the evaluation.
+        The totals are read from the running totals, without scanning the
+        evaluation lines.
+        Returns:
+            dict: The total score keyed by vendor ID.
+        """
+        self.ensure_one()
+        vendor_totals = dict.fromkeys(self.vendor_ids.ids, 0)
+        for total in self.total_ids:
+            if total.vendor_id.id in vendor_totals:
+                vendor_totals[total.vendor_id.id] = total.total_score
+        return vendor_totals
+
+    def _get_matrix_payload(self):
+        """
+        Returns the evaluation matrix in a JSON-serializable form.
+        This extends the data of `_load_matrix` with the labels the browser
+        needs to render the grid.
+        Returns:
+            dict: The matrix data along with the evaluation state and the
+                  question and vendor names.
+        """
+        self.ensure_one()
+        questions = self.env['vem.eval.question'].search([('active', '=', True)], order='sequence, id')
+        matrix = self._load_matrix(questions)
+        matrix.update({
+            'evaluation_id': self.id,
+            'state': self.state,
+            'questions': [{'id': question.id, 'name': question.name} for question in questions],
+            'vendors': [{'id': vendor.id, 'name': vendor.name} for vendor in self.vendor_ids],
+        })
+        return matrix
+
+    def _notify_score_deltas(self, saved, vendor_totals):
+        """
+        Publishes saved scores to the users viewing the evaluation matrix.
+        A single bus notification is sent on the channel of the evaluation
+        with one small delta per saved cell, so the open matrices only patch
+        the affected cells and totals.
+        Args:
+            saved (list): A list of (line_id, question_id, vendor_id, score,
+                          version) tuples for the saved lines.
+            vendor_totals (dict): The new total score of each changed vendor.
+        """
+        self.ensure_one()
+        if not saved:
+            return
+        self.env['bus.bus']._sendone(self, 'vem.score_delta', {
+            'evaluation_id': self.id,
+            'cells': [
+                {
+                    'question_id': question_id,
+                    'vendor_id': vendor_id,
+                    'score': score,
+                    'version': version,
+                    'vendor_total': vendor_totals.get(vendor_id),
+                }
+                for __, question_id, vendor_id, score, version in saved
+            ],
+        })
 
     def action_open_matrix(self):
         """
@@ -208,35 +548,88 @@ class VendorEvaluation(models.Model):
 
     def action_submit(self):
         """
-        Submits the evaluation and sets its state to 'submitted'.
-        This action validates that all evaluation lines have been filled in
-        with valid scores before changing the state. Once submitted, the
+        Submits the evaluations and sets their state to 'submitted'.
+        This action validates that all the evaluation lines have been filled
+        in with valid scores before changing the state. Once submitted, an
         evaluation is considered final and approved.
+        The completeness and score checks of all the evaluations run in one
+        aggregate query, so a whole batch of evaluations can be submitted at
+        once.
         """
-        self.ensure_one()
-
-        # Refresh data to ensure we have latest scores
-        self.env.invalidate_all()
-
-        if not self.line_ids:
-            raise UserError("No evaluation data found. Please complete the evaluation first.")
-
-        # Check if all vendors have at least some scores
-        total_expected_lines = len(self.vendor_ids) * len(self.env['vem.eval.question'].search([('active', '=', True)]))
-
-        if len(self.line_ids) < total_expected_lines:
-            raise UserError("Please complete all evaluation scores before submitting.")
+        to_submit = self.filtered(lambda evaluation: evaluation.state != 'submitted')
+        if not to_submit:
+            return
 
-        # Check if all scores are valid
-        invalid_scores = self.line_ids.filtered(lambda l: not l.score or l.score < 1 or l.score > 5)
-        if invalid_scores:
-            raise UserError("All evaluation scores must be between 1 and 5 before submitting.")
+        empty, incomplete, invalid = to_submit._check_submittable()
+        if empty:
+            raise UserError("No evaluation data found for %s. Please complete the evaluation first."
+                            % ', '.join(empty.mapped('name')))
+        if incomplete:
+            raise UserError("Please complete all evaluation scores of %s before submitting."
+                            % ', '.join(incomplete.mapped('name')))
+        if invalid:
+            raise UserError("All evaluation scores of %s must be between 1 and 5 before submitting."
+                            % ', '.join(invalid.mapped('name')))
 
         # Update state - submitted is now the final approved state
-        self.write({
+        to_submit.write({
             'state': 'submitted',
             'submit_date': fields.Datetime.now()
         })
+        self.env['vem.team.leaderboard']._trigger_refresh()
+
+    def _check_submittable(self):
+        """
+        Checks the lines of the evaluations in one aggregate query.
+        Pending ORM writes to the lines, questions and teams of the
+        evaluations are flushed first, so scores saved in this transaction are
+        taken into account without invalidating the cache.
+        Returns:
+            tuple: The evaluations without any line, the evaluations with
+                   fewer lines than teams times active questions, and the
+                   evaluations with missing or out of range scores.
+        """
+        self.env['vem.evaluation.line'].flush_model(['evaluation_id', 'score'])
+        self.env['vem.eval.question'].flush_model(['active'])
+        self.flush_recordset(['vendor_ids'])
+        self.env.cr.execute("""
+            WITH question AS (
+                SELECT COUNT(*) AS question_count
+                  FROM vem_eval_question
+                 WHERE active
+            ), line AS (
+                  SELECT evaluation_id,
+                         COUNT(*) AS line_count,
+                         COUNT(*) FILTER (WHERE score IS NULL OR score < 1 OR score > 5) AS invalid_count
+                    FROM vem_evaluation_line
+                   WHERE evaluation_id = ANY(%(ids)s)
+                GROUP BY evaluation_id
+            ), vendor AS (
+                  SELECT vem_evaluation_id AS evaluation_id, COUNT(*) AS vendor_count
+                    FROM vem_evaluation_vem_vendor_rel
+                   WHERE vem_evaluation_id = ANY(%(ids)s)
+                GROUP BY vem_evaluation_id
+            )
+               SELECT evaluation.id,
+                      COALESCE(line.line_count, 0),
+                      COALESCE(line.invalid_count, 0),
+                      COALESCE(vendor.vendor_count, 0) * question.question_count
+                 FROM vem_evaluation evaluation
+           CROSS JOIN question
+            LEFT JOIN line ON line.evaluation_id = evaluation.id
+            LEFT JOIN vendor ON vendor.evaluation_id = evaluation.id
+                WHERE evaluation.id = ANY(%(ids)s)
+        """, {'ids': self.ids})
+
+        empty_ids, incomplete_ids, invalid_ids = [], [], []
+        for evaluation_id, line_count, invalid_count, expected_count in self.env.cr.fetchall():
+            if not line_count:
+                empty_ids.append(evaluation_id)
+            elif line_count < expected_count:
+                incomplete_ids.append(evaluation_id)
+            elif invalid_count:
+                invalid_ids.append(evaluation_id)
+        return self.browse(empty_ids), self.browse(incomplete_ids), self.browse(invalid_ids)
 
     def action_reset_to_draft(self):
         """
@@ -250,6 +643,7 @@ class VendorEvaluation(models.Model):
             'submit_date': False,
             'approve_date': False
         })
+        self.env['vem.team.leaderboard']._trigger_refresh()
 
     def get_summary_data(self):
         """
@@ -308,68 +702,249 @@ class VendorEvaluation(models.Model):
         return summary_data
 
     @api.model
-    def get_multi_evaluation_summary(self, evaluation_ids):
+    def get_multi_evaluation_summary(self, evaluation_ids, data_freshness=None):
         """
         Retrieves summary data for multiple evaluations.
         This method compiles all the necessary data for a multi-evaluation
         summary, including information about all evaluators, teams, questions,
-        and scores.
+        and scores. The computed data is cached, keyed by the evaluation IDs
+        and by the freshness of their data (see `_get_data_freshness`), so
+        opening the same summary again only costs the query
+        checking that freshness.
         Args:
             evaluation_ids (list): A list of IDs of the evaluations to include
                                    in the summary.
+            data_freshness (tuple): The result of `_get_data_freshness` for
+                                    these evaluations, when the caller already
+                                    read it in this transaction.
         Returns:
             dict: A dictionary containing the structured summary data.
         """
-        evaluations = self.browse(evaluation_ids)
+        if data_freshness is None:
+            data_freshness = self._get_data_freshness(evaluation_ids)
+        existing_ids, freshness = data_freshness
 
-        if not evaluations.exists():
+        if not existing_ids:
             return {}
 
+        key = (self.env.cr.dbname, tuple(existing_ids), freshness)
+        payload = _summary_cache.get(key)
+        if payload is None:
+            payload = self.browse(existing_ids)._compute_summary_payload()
+            _summary_cache[key] = payload
+
+        existing = set(existing_ids)
+        evaluations = self.browse([id_ for id_ in dict.fromkeys(evaluation_ids) if id_ in existing])
+        return evaluations._bind_summary_payload(payload)
+
+    @api.model
+    def _get_data_freshness(self, evaluation_ids):
+        """
+        Reads what identifies the current state of the data displayed for
+        some evaluations, with one query.
+        The `write_date` of the records is the start time of the transaction
+        that wrote them, so a transaction committing after a concurrent read
+        may leave it unchanged. The freshness therefore also includes the
+        revisions of the evaluations and the versions of the lines, which are
+        incremented by every change of an evaluation and of a score, and the
+        weights of the questions; the counts catch deletions.
+        This is used to key the summary cache and to validate the HTTP
+        caches of the matrix and summary pages.
+        Args:
+            evaluation_ids (list): A list of evaluation IDs.
+        Returns:
+            tuple: The sorted IDs of the existing evaluations, and a tuple
+                   that changes whenever the data of these evaluations may
+                   change.
+        """
+        self.env['vem.evaluation.line'].flush_model(['evaluation_id', 'version', 'write_date'])
+        self.flush_model(['vendor_ids', 'revision', 'write_date'])
+        self.env['vem.eval.question'].flush_model(['active', 'weight', 'write_date'])
+        self.env['vem.vendor'].flush_model(['write_date'])
+        self.env.cr.execute("""
+            SELECT evaluation.ids, evaluation.revision, evaluation.write_date,
+                   line.count, line.version, line.write_date,
+                   question.count, question.weight, question.write_date,
+                   vendor.write_date
+              FROM (SELECT ARRAY_AGG(id ORDER BY id) AS ids, SUM(revision) AS revision,
+                           MAX(write_date) AS write_date
+                      FROM vem_evaluation
+                     WHERE id = ANY(%(ids)s)) evaluation,
+                   (SELECT COUNT(*) AS count, SUM(version) AS version, MAX(write_date) AS write_date
+                      FROM vem_evaluation_line
+                     WHERE evaluation_id = ANY(%(ids)s)) line,
+                   (SELECT COUNT(*) FILTER (WHERE active) AS count, SUM(weight) AS weight,
+                           MAX(write_date) AS write_date
+                      FROM vem_eval_question) question,
+                   (SELECT MAX(vendor.write_date) AS write_date
+                      FROM vem_vendor vendor
+                      JOIN vem_evaluation_vem_vendor_rel rel ON rel.vem_vendor_id = vendor.id
+                     WHERE rel.vem_evaluation_id = ANY(%(ids)s)) vendor
+        """, {'ids': list(evaluation_ids)})
+        existing_ids, *freshness = self.env.cr.fetchone()
+        return existing_ids or [], tuple(freshness)
+
+    def _compute_summary_payload(self):
+        """
+        Computes the summary data of the evaluations, without records.
+        The scores are loaded with one query into a NumPy (evaluations,
+        questions, teams) cube, from which the totals and the per-evaluation
+        score tables are sliced, while the weighted percentages of the teams
+        are read from the running totals. Only IDs and plain values are
+        returned, so the result can be cached and reused by later requests.
+        Returns:
+            dict: The summary data, with records replaced by their IDs.
+        """
         # Get all teams from selected evaluations
-        all_teams = evaluations.mapped('vendor_ids')
+        all_teams = self.mapped('vendor_ids')
 
         # Get all questions
         questions = self.env['vem.eval.question'].search([('active', '=', True)], order='sequence')
 
-        # Prepare summary data structure
-        summary_data = {
-            'evaluations': evaluations,
-            'teams': all_teams,
-            'questions': questions,
-            'evaluators': [],
-            'team_totals': {team.id: 0 for team in all_teams},
-            'grand_total': 0
+        cube, __ = self._get_score_cube(questions, all_teams)
+
+        # Totals count every line of the teams, including archived questions
+        evaluator_scores = np.nansum(cube, axis=1).astype(int)
+        team_totals = evaluator_scores.sum(axis=0)
+
+        # Per-evaluation score tables of the active questions, None when the
+        # line does not exist
+        active_cube = cube[:, :len(questions), :]
+        score_rows = np.nan_to_num(active_cube).astype(int).astype(object)
+        score_rows[np.isnan(active_cube)] = None
+
+        # Weighted percentages, from the running totals
+        team_percentages = dict.fromkeys(all_teams.ids, 0.0)
+        for team, weighted_score, max_score in self.env['vem.evaluation.total']._read_group(
+                [('evaluation_id', 'in', self.ids), ('vendor_id', 'in', all_teams.ids)],
+                ['vendor_id'], ['weighted_score:sum', 'max_score:sum']):
+            team_percentages[team.id] = self._get_total_percentage(weighted_score, max_score)
+
+        team_ids = all_teams.ids
+        return {
+            'evaluation_ids': self.ids,
+            'team_ids': team_ids,
+            'question_ids': questions.ids,
+            'evaluators': [
+                {
+                    'name': evaluation.evaluator_name,
+                    'evaluation_id': evaluation.id,
+                    'team_scores': dict(zip(team_ids, scores)),
+                    'total': sum(scores),
+                }
+                for evaluation, scores in zip(self, evaluator_scores.tolist())
+            ],
+            'team_totals': dict(zip(team_ids, team_totals.tolist())),
+            'team_percentages': team_percentages,
+            'grand_total': int(team_totals.sum()),
+            'score_rows': score_rows.tolist(),
+            'cube': cube,
+            'stats': score_stats.to_json(score_stats.summarize(cube)),
         }
 
-        # Process each evaluation (each evaluator)
-        for evaluation in evaluations:
-            evaluator_data = {
-                'name': evaluation.evaluator_name,
-                'evaluation_id': evaluation.id,
-                'team_scores': {},
-                'total': 0
-            }
+    def _bind_summary_payload(self, payload):
+        """
+        Builds the summary data of the evaluations from a computed payload.
+        The IDs of the payload are replaced by records of the current
+        environment, and the per-evaluation data is reordered to follow the
+        order of the recordset.
+        Args:
+            payload (dict): The data returned by `_compute_summary_payload`
+                            for the same evaluations, in any order.
+        Returns:
+            dict: A dictionary containing the structured summary data.
+        """
+        position = {id_: index for index, id_ in enumerate(payload['evaluation_ids'])}
+        order = [position[id_] for id_ in self.ids]
+        return {
+            'evaluations': self,
+            'teams': self.env['vem.vendor'].browse(payload['team_ids']),
+            'questions': self.env['vem.eval.question'].browse(payload['question_ids']),
+            'evaluators': [payload['evaluators'][index] for index in order],
+            'team_totals': payload['team_totals'],
+            'team_percentages': payload['team_percentages'],
+            'grand_total': payload['grand_total'],
+            'score_rows': [payload['score_rows'][index] for index in order],
+            'cube': payload['cube'][order],
+            'stats': payload['stats'],
+        }
 
-            # Calculate scores for each team
-            for team in all_teams:
-                team_lines = evaluation.line_ids.filtered(lambda l: l.vendor_id.id == team.id)
-                team_score = sum(team_lines.mapped('score')) if team_lines else 0
-                evaluator_data['team_scores'][team.id] = team_score
-                evaluator_data['total'] += team_score
+    @api.model
+    def get_multi_evaluation_stats(self, evaluation_ids):
+        """
+        Retrieves the statistics of multiple evaluations.
+        The statistics are computed on the score cube of the evaluations,
+        see `tools.score_stats.summarize`.
+        Args:
+            evaluation_ids (list): A list of IDs of the evaluations to include
+                                   in the statistics.
+        Returns:
+            dict: A dictionary containing the teams and questions of the
+                  cube axes and the JSON-serializable statistics.
+        """
+        evaluations = self.browse(evaluation_ids).exists()
 
-                # Update team totals
-                summary_data['team_totals'][team.id] += team_score
+        if not evaluations:
+            return {}
 
-            summary_data['evaluators'].append(evaluator_data)
-            summary_data['grand_total'] += evaluator_data['total']
+        teams = evaluations.mapped('vendor_ids')
+        questions = self.env['vem.eval.question'].search([('active', '=', True)], order='sequence')
+        cube, question_ids = evaluations._get_score_cube(questions, teams)
 
-        return summary_data
+        return {
+            'evaluation_ids': evaluations.ids,
+            'teams': [{'id': team.id, 'name': team.name} for team in teams],
+            'question_ids': question_ids,
+            'stats': score_stats.to_json(score_stats.summarize(cube)),
+        }
+
+    def _get_score_cube(self, questions, teams):
+        """
+        Loads the scores of the evaluations into a dense NumPy array.
+        All the lines of the evaluations are fetched with a single query. The
+        question axis starts with the given questions, in order, followed by
+        any other question found in the lines (e.g. archived questions).
+        Args:
+            questions (recordset): The questions to put first on the question
+                                   axis.
+            teams (recordset): The teams of the team axis. Lines of other
+                               teams are ignored.
+        Returns:
+            tuple: A float array of shape (evaluations, questions, teams)
+                   holding the scores, with NaN where no line exists, and the
+                   list of question IDs of the question axis.
+        """
+        evaluation_ids = np.array(self.ids, dtype=np.int64)
+        team_ids = np.array(teams.ids, dtype=np.int64)
+        question_ids = np.array(questions.ids, dtype=np.int64)
+
+        self.env['vem.evaluation.line'].flush_model(['evaluation_id', 'question_id', 'vendor_id', 'score'])
+        self.env.cr.execute("""
+            SELECT evaluation_id, question_id, vendor_id, score
+              FROM vem_evaluation_line
+             WHERE evaluation_id = ANY(%s)
+               AND vendor_id = ANY(%s)
+        """, [self.ids, teams.ids])
+        rows = np.array(self.env.cr.fetchall(), dtype=np.int64).reshape(-1, 4)
+
+        extra_question_ids = np.setdiff1d(np.unique(rows[:, 1]), question_ids)
+        question_ids = np.concatenate([question_ids, extra_question_ids])
+
+        cube = np.full((len(evaluation_ids), len(question_ids), len(team_ids)), np.nan)
+        cube[
+            _positions(evaluation_ids, rows[:, 0]),
+            _positions(question_ids, rows[:, 1]),
+            _positions(team_ids, rows[:, 2]),
+        ] = rows[:, 3]
+        return cube, question_ids.tolist()
 
     def action_summary_preview(self):
         """
         Opens a summary preview for multiple evaluations in a new browser tab.
         This action generates a URL for the multi-evaluation summary page and
-        returns an action dictionary to open the URL.
+        returns an action dictionary to open the URL. Summaries of more than
+        `SUMMARY_SYNC_LIMIT` evaluations are generated in the background
+        instead.
         Returns:
             dict: An action dictionary to open the summary preview URL.
         """
@@ -378,6 +953,9 @@ class VendorEvaluation(models.Model):
         if not evaluation_ids:
             raise UserError("Vui lòng chọn ít nhất một đánh giá để xem tổng hợp.")
 
+        if len(evaluation_ids) > SUMMARY_SYNC_LIMIT:
+            return self.action_summary_report()
+
         # Convert IDs to string for URL
         ids_str = ','.join(map(str, evaluation_ids))
 
@@ -387,13 +965,34 @@ class VendorEvaluation(models.Model):
             'target': 'new',
         }
 
+    def action_summary_report(self):
+        """
+        Queues the generation of the summary report of the evaluations.
+        The report is built in the background and the user is notified when
+        it can be downloaded from the summary reports.
+        Returns:
+            dict: An action displaying a notification.
+        """
+        job = self.env['vem.report.job']._enqueue(self)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': 'TPM Summary',
+                'message': "The report %s is being generated. You will be notified when it is ready." % job.name,
+                'type': 'info',
+                'next': self.env['ir.actions.act_window']._for_xml_id('tpm_score_summary.action_report_job'),
+            },
+        }
+
     @api.model
     def save_score(self, evaluation_id, question_id, vendor_id, score):
         """
         Saves a score for a specific evaluation, question, and vendor.
         This method is designed to be called from the client-side to save
-        scores asynchronously. It performs validation to ensure that the
-        evaluation is in the correct state and that the score is valid.
+        scores asynchronously. The validation of the evaluation state and of
+        the score, and the save itself, are done by the score service shared
+        with the save routes of the matrix.
         Args:
             evaluation_id (int): The ID of the evaluation.
             question_id (int): The ID of the question.
@@ -401,40 +1000,17 @@ class VendorEvaluation(models.Model):
             score (int or float): The score to be saved.
         Returns:
             dict: A dictionary indicating the success or failure of the
-                  operation.
+                  operation, along with the updated total of the vendor.
         """
         try:
-            evaluation = self.browse(evaluation_id)
-
-            # Validate evaluation state
-            if evaluation.state != 'draft':
-                return {'error': 'Cannot modify submitted evaluation'}
-
-            # Validate score
-            if not isinstance(score, (int, float)) or score < 1 or score > 5:
-                return {'error': 'Score must be between 1 and 5'}
-
-            # Find existing line or create new one
-            line = self.env['vem.evaluation.line'].search([
-                ('evaluation_id', '=', evaluation_id),
-                ('question_id', '=', question_id),
-                ('vendor_id', '=', vendor_id)
-            ], limit=1)
-
-            if line:
-                line.write({'score': score})
-            else:
-                self.env['vem.evaluation.line'].create({
-                    'evaluation_id': evaluation_id,
-                    'question_id': question_id,
-                    'vendor_id': vendor_id,
-                    'score': score
-                })
-
-            # Trigger recomputation of total scores
-            evaluation._compute_total_scores()
-
-            return {'success': True}
+            result = self.env['vem.score.service']._save_scores(evaluation_id, [{
+                'question_id': question_id, 'vendor_id': vendor_id, 'score': score,
+            }])
+            if not result['success']:
+                return {'error': result['error']}
+            if result['errors']:
+                return {'error': result['errors'][0]['error']}
+            return {'success': True, 'vendor_totals': result['vendor_totals']}
 
         except Exception as e:
             # Log error for debugging
@@ -459,6 +1035,7 @@ class VendorEvaluationLine(models.Model):
         string='Evaluation',
         required=True,
         ondelete='cascade',
+        index=True,
         help='Reference to the evaluation'
     )
     question_id = fields.Many2one(
@@ -471,6 +1048,7 @@ class VendorEvaluationLine(models.Model):
         'vem.vendor',
         string='Team',
         required=True,
+        index=True,
         help='The team being evaluated'
     )
     score = fields.Integer(
@@ -479,22 +1057,28 @@ class VendorEvaluationLine(models.Model):
         default=1,
         help='Score from 1 to 5'
     )
+    version = fields.Integer(
+        string='Version',
+        required=True,
+        default=1,
+        readonly=True,
+        help='Incremented on every change of the score, so clients saving '
+             'offline edits can detect scores changed in the meantime'
+    )
 
-    # Computed fields for the views
+    # Related fields for the views. They are not stored, so renaming or
+    # re-sequencing a question does not rewrite its lines.
     question_sequence = fields.Integer(
         string='Question Sequence',
-        related='question_id.sequence',
-        store=True
+        related='question_id.sequence'
     )
     question_name = fields.Text(
         string='Question',
-        related='question_id.name',
-        store=True
+        related='question_id.name'
     )
     vendor_name = fields.Char(
         string='Team Name',
-        related='vendor_id.name',
-        store=True
+        related='vendor_id.name'
     )
 
     _sql_constraints = [
@@ -503,6 +1087,80 @@ class VendorEvaluationLine(models.Model):
          'Only one score per question per vendor per evaluation!')
     ]
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        """
+        Overrides the create method to add the scores of the new lines to
+        the running totals of their evaluation and vendor.
+        Args:
+            vals_list (list): A list of dictionaries of values to create new
+                              records.
+        Returns:
+            recordset: The newly created evaluation lines.
+        """
+        lines = super().create(vals_list)
+        self.env['vem.evaluation.total']._apply_deltas(lines._get_total_deltas())
+        return lines
+
+    def write(self, vals):
+        """
+        Overrides the write method to keep the running totals up to date
+        when the score, question, evaluation or vendor of lines change, and to
+        increment the version of lines whose score changes.
+        Args:
+            vals (dict): The values to write.
+        Returns:
+            bool: True
+        """
+        if not {'score', 'evaluation_id', 'vendor_id', 'question_id'} & set(vals):
+            return super().write(vals)
+        deltas = self._get_total_deltas(sign=-1)
+        rescored = self.filtered(lambda line: line.score != vals['score']) if 'score' in vals else self.browse()
+        res = super().write(vals)
+        for key, values in self._get_total_deltas().items():
+            delta = deltas[key]
+            for index, value in enumerate(values):
+                delta[index] += value
+        self.env['vem.evaluation.total']._apply_deltas(deltas)
+        if rescored:
+            self.flush_recordset(['score'])
+            self.env.cr.execute("UPDATE vem_evaluation_line SET version = version + 1 WHERE id = ANY(%s)",
+                                [rescored.ids])
+            rescored.invalidate_recordset(['version'])
+        return res
+
+    def unlink(self):
+        """
+        Overrides the unlink method to remove the scores of the deleted lines
+        from the running totals.
+        Returns:
+            bool: True
+        """
+        deltas = self._get_total_deltas(sign=-1)
+        res = super().unlink()
+        self.env['vem.evaluation.total']._apply_deltas(deltas)
+        return res
+
+    def _get_total_deltas(self, sign=1):
+        """
+        Returns the contribution of the lines to the running totals.
+        Args:
+            sign (int): 1 to add the lines to the totals, -1 to remove them.
+        Returns:
+            defaultdict: A dictionary mapping (evaluation_id, vendor_id) to
+                         a [score_delta, line_count_delta,
+                         weighted_score_delta, max_score_delta] list.
+        """
+        deltas = defaultdict(lambda: [0, 0, 0.0, 0.0])
+        for line in self:
+            weight = line.question_id.weight
+            delta = deltas[(line.evaluation_id.id, line.vendor_id.id)]
+            delta[0] += sign * line.score
+            delta[1] += sign
+            delta[2] += sign * line.score * weight
+            delta[3] += sign * SCORE_MAX * weight
+        return deltas
+
     @api.constrains('score')
     def _check_score(self):
         """
@@ -513,3 +1171,226 @@ class VendorEvaluationLine(models.Model):
         for line in self:
             if line.score < 1 or line.score > 5:
                 raise ValidationError("Score must be between 1 and 5")
+
+    @api.model
+    def _insert_lines(self, evaluations, keys, score=1):
+        """
+        Inserts many evaluation lines with a single statement.
+        Lines that already exist are left untouched, and the running totals
+        of the vendors are updated with the inserted scores.
+        Args:
+            evaluations (recordset): The evaluations the lines belong to.
+            keys (list): A list of (evaluation_id, question_id, vendor_id)
+                         tuples.
+            score (int): The initial score of the lines.
+        Returns:
+            int: The number of inserted lines.
+        """
+        if not keys:
+            return 0
+
+        self.flush_model()
+        evaluation_ids, question_ids, vendor_ids = zip(*keys)
+        now = self.env.cr.now()
+        self.env.cr.execute("""
+            INSERT INTO vem_evaluation_line (
+                evaluation_id, question_id, vendor_id, score, version,
+                create_uid, create_date, write_uid, write_date)
+            SELECT line.evaluation_id, line.question_id, line.vendor_id, %(score)s, 1,
+                   %(uid)s, %(now)s, %(uid)s, %(now)s
+              FROM UNNEST(%(evaluation_ids)s::int[], %(question_ids)s::int[], %(vendor_ids)s::int[])
+                   AS line(evaluation_id, question_id, vendor_id)
+              JOIN vem_eval_question question ON question.id = line.question_id
+              JOIN vem_vendor vendor ON vendor.id = line.vendor_id
+                ON CONFLICT (evaluation_id, question_id, vendor_id) DO NOTHING
+         RETURNING evaluation_id, vendor_id, question_id
+        """, {
+            'evaluation_ids': list(evaluation_ids),
+            'question_ids': list(question_ids),
+            'vendor_ids': list(vendor_ids),
+            'score': score,
+            'uid': self.env.uid,
+            'now': now,
+        })
+        rows = self.env.cr.fetchall()
+        evaluations.invalidate_recordset(['line_ids'])
+
+        weights = self.env['vem.eval.question']._get_weights({question_id for __, __, question_id in rows})
+        deltas = defaultdict(lambda: [0, 0, 0.0, 0.0])
+        for evaluation_id, vendor_id, question_id in rows:
+            delta = deltas[(evaluation_id, vendor_id)]
+            delta[0] += score
+            delta[1] += 1
+            delta[2] += score * weights[question_id]
+            delta[3] += SCORE_MAX * weights[question_id]
+        self.env['vem.evaluation.total']._apply_deltas(deltas)
+        return len(rows)
+
+    @api.model
+    def _upsert_scores(self, evaluation, cells):
+        """
+        Inserts or updates the scores of many cells of an evaluation at once.
+        The existing lines of the cells are locked first, which also reads
+        their latest committed scores, even when another transaction changed
+        them after this one started. The missing lines are then inserted
+        with one statement, and the locked lines updated with another. Lines
+        inserted by a concurrent save in the meantime are not inserted twice:
+        they are locked and updated like the other existing lines. The score
+        deltas computed from the locked scores are applied to the running
+        totals of the vendors, and published to the viewers of the matrix.
+        Cells referencing unknown questions or vendors are ignored.
+        A cell may carry the version of the line its score was based on (0
+        when the line did not exist). Such a cell is only saved if the line
+        is still at that version, so edits made offline do not overwrite
+        scores changed in the meantime. The version is checked by the update
+        itself, against the locked line. Saving the score a line already has
+        keeps its version, so it does not make other clients conflict.
+        Args:
+            evaluation (recordset): The evaluation the cells belong to.
+            cells (list): A list of (question_id, vendor_id, score) or
+                          (question_id, vendor_id, score, version) tuples.
+                          When a cell appears several times, the last score
+                          wins.
+        Returns:
+            tuple: A list of (line_id, question_id, vendor_id, score, version)
+                   tuples for the saved lines, and a dictionary mapping the
+                   ID of each changed vendor to its new total score.
+        """
+        evaluation.ensure_one()
+        latest = {(cell[0], cell[1]): (cell[2], cell[3] if len(cell) > 3 else None) for cell in cells}
+        if not latest:
+            return [], {}
+
+        self.flush_model()
+        previous = self._read_cells(evaluation, list(latest), lock=True)
+
+        inserted = []
+        missing = [key for key in latest if key not in previous]
+        if missing:
+            inserted = self._insert_cells(evaluation, {key: latest[key] for key in missing})
+            inserted_keys = {(question_id, vendor_id) for __, question_id, vendor_id, __, __ in inserted}
+            # Lines inserted by concurrent saves since the lines were locked
+            previous.update(self._read_cells(
+                evaluation, [key for key in missing if key not in inserted_keys], lock=True))
+
+        updated = []
+        existing = [key for key in latest if key in previous]
+        if existing:
+            now = self.env.cr.now()
+            self.env.cr.execute("""
+                UPDATE vem_evaluation_line line
+                   SET score = cell.score,
+                       version = CASE WHEN cell.score IS DISTINCT FROM line.score
+                                      THEN line.version + 1 ELSE line.version END,
+                       write_uid = %(uid)s,
+                       write_date = %(now)s
+                  FROM UNNEST(%(line_ids)s::int[], %(scores)s::int[], %(versions)s::int[])
+                       AS cell(line_id, score, version)
+                 WHERE line.id = cell.line_id
+                   AND (cell.version IS NULL OR cell.version = line.version)
+             RETURNING line.id, line.question_id, line.vendor_id, line.score, line.version
+            """, {
+                'line_ids': [previous[key][0] for key in existing],
+                'scores': [latest[key][0] for key in existing],
+                'versions': [latest[key][1] for key in existing],
+                'uid': self.env.uid,
+                'now': now,
+            })
+            updated = self.env.cr.fetchall()
+
+        # The statements bypassed the ORM: drop the cached values they changed
+        self.invalidate_model(['score', 'version', 'write_uid', 'write_date'])
+        evaluation.invalidate_recordset(['line_ids'])
+
+        saved = inserted + updated
+        weights = self.env['vem.eval.question']._get_weights({question_id for __, question_id, __, __, __ in saved})
+        deltas = defaultdict(lambda: [0, 0, 0.0, 0.0])
+        for __, question_id, vendor_id, score, __ in inserted:
+            delta = deltas[(evaluation.id, vendor_id)]
+            delta[0] += score
+            delta[1] += 1
+            delta[2] += score * weights[question_id]
+            delta[3] += SCORE_MAX * weights[question_id]
+        for __, question_id, vendor_id, score, __ in updated:
+            score_delta = score - previous[(question_id, vendor_id)][1]
+            delta = deltas[(evaluation.id, vendor_id)]
+            delta[0] += score_delta
+            delta[2] += score_delta * weights[question_id]
+        totals = self.env['vem.evaluation.total']._apply_deltas(deltas)
+        vendor_totals = {vendor_id: figures['total_score'] for (__, vendor_id), figures in totals.items()}
+
+        evaluation._notify_score_deltas(saved, vendor_totals)
+        return saved, vendor_totals
+
+    @api.model
+    def _insert_cells(self, evaluation, cells):
+        """
+        Inserts the lines of cells that have none yet.
+        Cells carrying a version other than 0 were based on a line that no
+        longer exists, and are not inserted. Lines inserted concurrently by
+        another transaction are left untouched.
+        Args:
+            evaluation (recordset): The evaluation the cells belong to.
+            cells (dict): A dictionary mapping (question_id, vendor_id) to
+                          a (score, version) tuple.
+        Returns:
+            list: A list of (line_id, question_id, vendor_id, score, version)
+                  tuples for the inserted lines.
+        """
+        question_ids, vendor_ids = zip(*cells)
+        now = self.env.cr.now()
+        self.env.cr.execute("""
+            INSERT INTO vem_evaluation_line (
+                evaluation_id, question_id, vendor_id, score, version,
+                create_uid, create_date, write_uid, write_date)
+            SELECT %(evaluation_id)s, cell.question_id, cell.vendor_id, cell.score, 1,
+                   %(uid)s, %(now)s, %(uid)s, %(now)s
+              FROM UNNEST(%(question_ids)s::int[], %(vendor_ids)s::int[], %(scores)s::int[], %(versions)s::int[])
+                   AS cell(question_id, vendor_id, score, version)
+              JOIN vem_eval_question question ON question.id = cell.question_id
+              JOIN vem_vendor vendor ON vendor.id = cell.vendor_id
+             WHERE COALESCE(cell.version, 0) = 0
+                ON CONFLICT (evaluation_id, question_id, vendor_id) DO NOTHING
+         RETURNING id, question_id, vendor_id, score, version
+        """, {
+            'evaluation_id': evaluation.id,
+            'question_ids': list(question_ids),
+            'vendor_ids': list(vendor_ids),
+            'scores': [score for score, __ in cells.values()],
+            'versions': [version for __, version in cells.values()],
+            'uid': self.env.uid,
+            'now': now,
+        })
+        return self.env.cr.fetchall()
+
+    @api.model
+    def _read_cells(self, evaluation, keys, lock=False):
+        """
+        Reads the current state of some cells of an evaluation.
+        Args:
+            evaluation (recordset): The evaluation the cells belong to.
+            keys (list): A list of (question_id, vendor_id) tuples.
+            lock (bool): Whether to lock the lines until the end of the
+                         transaction. Locking waits for the transactions
+                         changing the lines, and reads the scores they
+                         committed.
+        Returns:
+            dict: A dictionary mapping (question_id, vendor_id) to the
+                  (line_id, score, version) tuple of the existing lines.
+        """
+        if not keys:
+            return {}
+        self.flush_model(['evaluation_id', 'question_id', 'vendor_id', 'score', 'version'])
+        question_ids, vendor_ids = zip(*keys)
+        self.env.cr.execute(f"""
+               SELECT line.question_id, line.vendor_id, line.id, line.score, line.version
+                 FROM vem_evaluation_line line
+                 JOIN UNNEST(%s::int[], %s::int[]) AS cell(question_id, vendor_id)
+                   ON cell.question_id = line.question_id
+                  AND cell.vendor_id = line.vendor_id
+                WHERE line.evaluation_id = %s
+             ORDER BY line.id
+            {'FOR NO KEY UPDATE OF line' if lock else ''}
+        """, [list(question_ids), list(vendor_ids), evaluation.id])
+        return {(question_id, vendor_id): (line_id, score, version)
+                for question_id, vendor_id, line_id, score, version in self.env.cr.fetchall()}
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api
+
+SCORE_MAX = 5  # highest score of an evaluation line
+
+# Percentage of the weighted score over the maximum weighted score, for the
+# given SQL expressions
+PERCENTAGE_SQL = """
+    CASE WHEN {max_score} > 0 THEN ROUND({weighted_score} * 100 / {max_score}, 2) ELSE 0 END
+"""
+
+
+class VendorEvaluationTotal(models.Model):
+    """
+    Represents the running total of the scores of one vendor in one
+    evaluation.
+    The totals are maintained incrementally from the score deltas (new score
+    minus old score) of the evaluation lines, so reading the total of a
+    vendor after a save does not require scanning the evaluation lines. The
+    scores weighted by the weights of their questions, the maximum weighted
+    score and the resulting percentage are maintained by the same
+    statements, so reports read normalized figures instead of computing
+    them.
+    The totals are plain columns, indexed by team, submit date and
+    percentage, so rankings and aggregates over many evaluations are sorted
+    and grouped by PostgreSQL.
+    """
+    _name = 'vem.evaluation.total'
+    _description = 'Evaluation Team Total'
+    _order = 'evaluation_id, vendor_id'
+    _rec_name = 'vendor_id'
+    _log_access = False
+
+    evaluation_id = fields.Many2one(
+        'vem.evaluation',
+        string='Evaluation',
+        required=True,
+        readonly=True,
+        ondelete='cascade',
+        help='Reference to the evaluation'
+    )
+    vendor_id = fields.Many2one(
+        'vem.vendor',
+        string='Team',
+        required=True,
+        readonly=True,
+        ondelete='cascade',
+        index=True,
+        help='The team being evaluated'
+    )
+    evaluation_state = fields.Selection(
+        related='evaluation_id.state',
+        string='Evaluation State',
+        store=True
+    )
+    submit_date = fields.Datetime(
+        related='evaluation_id.submit_date',
+        string='Submit Date',
+        store=True,
+        index=True
+    )
+    total_score = fields.Integer(
+        string='Total Score',
+        readonly=True,
+        help='Sum of the scores of the team in the evaluation'
+    )
+    line_count = fields.Integer(
+        string='Lines Count',
+        readonly=True,
+        help='Number of evaluation lines of the team in the evaluation'
+    )
+    weighted_score = fields.Float(
+        string='Weighted Score',
+        digits=(16, 2),
+        readonly=True,
+        help='Sum of the scores of the team, each multiplied by the weight of its question'
+    )
+    max_score = fields.Float(
+        string='Max Score',
+        digits=(16, 2),
+        readonly=True,
+        help='Highest weighted score the team can get in the evaluation'
+    )
+    percentage = fields.Float(
+        string='Percentage',
+        digits=(16, 2),
+        readonly=True,
+        index=True,
+        aggregator=None,
+        help='Weighted score of the team as a percentage of the max score'
+    )
+
+    _sql_constraints = [
+        ('unique_evaluation_vendor', 'UNIQUE(evaluation_id, vendor_id)',
+         'Only one total per vendor per evaluation!')
+    ]
+
+    def init(self):
+        """
+        Rebuilds all the totals from the evaluation lines.
+        This runs when the module is installed or upgraded, so totals of
+        lines written before the table existed are taken into account.
+        """
+        self._rebuild()
+
+    @api.model
+    def _rebuild(self, evaluation_ids=None):
+        """
+        Recomputes totals from the evaluation lines, in one grouped query.
+        This is used when the weights of questions change, as the weighted
+        figures of every line of these questions change at once.
+        Args:
+            evaluation_ids (list): The IDs of the evaluations whose totals
+                                   are recomputed, all of them if None.
+        """
+        self.env['vem.evaluation.line'].flush_model(['evaluation_id', 'question_id', 'vendor_id', 'score'])
+        self.env['vem.eval.question'].flush_model(['weight'])
+        self.env.cr.execute(f"""
+            INSERT INTO vem_evaluation_total (
+                evaluation_id, vendor_id, total_score, line_count,
+                weighted_score, max_score, percentage, evaluation_state, submit_date)
+                 SELECT total.*, {PERCENTAGE_SQL.format(
+                            weighted_score='total.weighted_score', max_score='total.max_score')},
+                        evaluation.state, evaluation.submit_date
+                   FROM (SELECT line.evaluation_id, line.vendor_id,
+                                SUM(line.score), COUNT(*),
+                                SUM(line.score * question.weight) AS weighted_score,
+                                SUM(question.weight) * %(score_max)s AS max_score
+                           FROM vem_evaluation_line line
+                           JOIN vem_eval_question question ON question.id = line.question_id
+                          WHERE %(evaluation_ids)s::int[] IS NULL
+                             OR line.evaluation_id = ANY(%(evaluation_ids)s::int[])
+                       GROUP BY line.evaluation_id, line.vendor_id) total
+                   JOIN vem_evaluation evaluation ON evaluation.id = total.evaluation_id
+            ON CONFLICT (evaluation_id, vendor_id) DO UPDATE
+                    SET total_score = EXCLUDED.total_score,
+                        line_count = EXCLUDED.line_count,
+                        weighted_score = EXCLUDED.weighted_score,
+                        max_score = EXCLUDED.max_score,
+                        percentage = EXCLUDED.percentage
+        """, {'evaluation_ids': evaluation_ids, 'score_max': SCORE_MAX})
+        self.invalidate_model()
+        self.env['vem.evaluation'].invalidate_model(['total_ids'])
+
+    @api.model
+    def _apply_deltas(self, deltas):
+        """
+        Adds score and line count deltas to the running totals.
+        The percentages of the changed totals are recomputed by the same
+        statement.
+        Args:
+            deltas (dict): A dictionary mapping (evaluation_id, vendor_id) to
+                           a (score_delta, line_count_delta,
+                           weighted_score_delta, max_score_delta) tuple.
+        Returns:
+            dict: A dictionary mapping (evaluation_id, vendor_id) to the new
+                  figures of the total, keyed by field name.
+        """
+        if not deltas:
+            return {}
+
+        # Sorted, so concurrent transactions lock the totals in the same order
+        keys = sorted(deltas)
+        self.flush_model()
+        self.env.cr.execute(f"""
+            INSERT INTO vem_evaluation_total AS total (
+                evaluation_id, vendor_id, total_score, line_count,
+                weighted_score, max_score, percentage, evaluation_state, submit_date)
+                 SELECT delta.*, {PERCENTAGE_SQL.format(
+                            weighted_score='delta.weighted_score', max_score='delta.max_score')},
+                        evaluation.state, evaluation.submit_date
+                   FROM UNNEST(%s::int[], %s::int[], %s::int[], %s::int[], %s::numeric[], %s::numeric[])
+                        AS delta(evaluation_id, vendor_id, total_score, line_count, weighted_score, max_score)
+                   JOIN vem_evaluation evaluation ON evaluation.id = delta.evaluation_id
+            ON CONFLICT (evaluation_id, vendor_id) DO UPDATE
+                    SET total_score = total.total_score + EXCLUDED.total_score,
+                        line_count = total.line_count + EXCLUDED.line_count,
+                        weighted_score = total.weighted_score + EXCLUDED.weighted_score,
+                        max_score = total.max_score + EXCLUDED.max_score,
+                        percentage = {PERCENTAGE_SQL.format(
+                            weighted_score='(total.weighted_score + EXCLUDED.weighted_score)',
+                            max_score='(total.max_score + EXCLUDED.max_score)')}
+              RETURNING evaluation_id, vendor_id, total_score, weighted_score, max_score, percentage
+        """, [
+            [evaluation_id for evaluation_id, __ in keys],
+            [vendor_id for __, vendor_id in keys],
+            [deltas[key][0] for key in keys],
+            [deltas[key][1] for key in keys],
+            [deltas[key][2] for key in keys],
+            [deltas[key][3] for key in keys],
+        ])
+        totals = {
+            (evaluation_id, vendor_id): {
+                'total_score': total_score,
+                'weighted_score': float(weighted_score),
+                'max_score': float(max_score),
+                'percentage': float(percentage),
+            }
+            for evaluation_id, vendor_id, total_score, weighted_score, max_score, percentage
+            in self.env.cr.fetchall()
+        }
+        self.invalidate_model(['total_score', 'line_count', 'weighted_score', 'max_score', 'percentage'])
+        self.env['vem.evaluation'].invalidate_model(['total_ids'])
+        return totals
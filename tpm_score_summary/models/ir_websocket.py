@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models
+
+EVALUATION_CHANNEL_PREFIX = 'vem_evaluation_'
+
+
+class IrWebsocket(models.AbstractModel):
+    """
+    Lets the evaluation matrix subscribe to the bus channel of its
+    evaluation.
+    """
+    _inherit = 'ir.websocket'
+
+    def _build_bus_channel_list(self, channels):
+        """
+        Replaces the evaluation channel names requested by the client with
+        the evaluation records, keeping only the evaluations the user can
+        read.
+        Args:
+            channels (list): The channels requested by the client.
+        Returns:
+            list: The channels the client is subscribed to.
+        """
+        channels = list(channels)
+        evaluation_ids = {
+            int(channel[len(EVALUATION_CHANNEL_PREFIX):])
+            for channel in channels
+            if isinstance(channel, str)
+            and channel.startswith(EVALUATION_CHANNEL_PREFIX)
+            and channel[len(EVALUATION_CHANNEL_PREFIX):].isdigit()
+        }
+        if evaluation_ids:
+            channels = [
+                channel for channel in channels
+                if not (isinstance(channel, str) and channel.startswith(EVALUATION_CHANNEL_PREFIX))
+            ]
+            Evaluation = self.env['vem.evaluation']
+            if Evaluation.has_access('read'):
+                channels.extend(Evaluation.browse(evaluation_ids).exists()._filtered_access('read'))
+        return super()._build_bus_channel_list(channels)
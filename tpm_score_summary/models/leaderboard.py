@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields
+
+from .evaluation_total import PERCENTAGE_SQL
+
+
+class VendorEvalLeaderboard(models.Model):
+    """
+    Represents the leaderboard of the teams, per month, over all the
+    submitted evaluations.
+    The figures are read from a PostgreSQL materialized view over the
+    running totals of the evaluations, so the leaderboard neither aggregates
+    the evaluation lines nor weights the scores on every read. The
+    view is refreshed concurrently (without blocking readers) by a cron job,
+    which is also triggered whenever evaluations are submitted or reset to
+    draft.
+    """
+    _name = 'vem.team.leaderboard'
+    _description = 'Team Leaderboard'
+    _auto = False
+    _order = 'period desc, percentage desc'
+    _rec_name = 'vendor_id'
+
+    vendor_id = fields.Many2one(
+        'vem.vendor',
+        string='Team',
+        readonly=True
+    )
+    period = fields.Date(
+        string='Month',
+        readonly=True,
+        help='First day of the month the evaluations were submitted'
+    )
+    score_sum = fields.Integer(
+        string='Total Score',
+        readonly=True
+    )
+    average_score = fields.Float(
+        string='Average Score',
+        readonly=True,
+        aggregator=None,
+        help='Average score of the team per question'
+    )
+    average_total = fields.Float(
+        string='Average Total',
+        readonly=True,
+        aggregator=None,
+        help='Average total score of the team per evaluation'
+    )
+    weighted_score = fields.Float(
+        string='Weighted Score',
+        digits=(16, 2),
+        readonly=True,
+        help='Sum of the weighted scores of the team'
+    )
+    percentage = fields.Float(
+        string='Percentage',
+        digits=(16, 2),
+        readonly=True,
+        aggregator=None,
+        help='Weighted score of the team as a percentage of the max weighted score'
+    )
+    line_count = fields.Integer(
+        string='Lines Count',
+        readonly=True
+    )
+    evaluation_count = fields.Integer(
+        string='Evaluation Count',
+        readonly=True,
+        help='Number of submitted evaluations of the team'
+    )
+
+    def init(self):
+        """
+        Creates the materialized view and the unique index required to
+        refresh it concurrently.
+        """
+        self.env.cr.execute(f"DROP MATERIALIZED VIEW IF EXISTS {self._table}")
+        self.env.cr.execute(f"""
+            CREATE MATERIALIZED VIEW {self._table} AS
+                 SELECT MIN(total.id) AS id,
+                        total.vendor_id,
+                        DATE_TRUNC('month', COALESCE(evaluation.submit_date, evaluation.create_date))::date AS period,
+                        SUM(total.total_score) AS score_sum,
+                        (SUM(total.total_score)::float / NULLIF(SUM(total.line_count), 0)) AS average_score,
+                        AVG(total.total_score)::float AS average_total,
+                        SUM(total.weighted_score)::float AS weighted_score,
+                        ({PERCENTAGE_SQL.format(
+                            weighted_score='SUM(total.weighted_score)', max_score='SUM(total.max_score)')})::float
+                            AS percentage,
+                        SUM(total.line_count) AS line_count,
+                        COUNT(*) AS evaluation_count
+                   FROM vem_evaluation_total total
+                   JOIN vem_evaluation evaluation ON evaluation.id = total.evaluation_id
+                  WHERE evaluation.state = 'submitted'
+                    AND total.line_count > 0
+               GROUP BY total.vendor_id, period
+        """)
+        self.env.cr.execute(f"""
+            CREATE UNIQUE INDEX {self._table}_vendor_period_uniq
+                ON {self._table} (vendor_id, period)
+        """)
+
+    def _refresh(self):
+        """
+        Refreshes the materialized view without blocking its readers.
+        This is run by the leaderboard cron job.
+        """
+        self.env.cr.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {self._table}")
+        self.invalidate_model()
+
+    def _trigger_refresh(self):
+        """
+        Schedules a refresh of the leaderboard as soon as possible.
+        The refresh runs in the cron worker, so the user's request does not
+        wait for it.
+        """
+        self.env.ref('tpm_score_summary.ir_cron_refresh_leaderboard').sudo()._trigger()
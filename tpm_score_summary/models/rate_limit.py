@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+from odoo import models, fields, api
+from odoo.sql_db import db_connect
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_RATE_LIMIT = '100/60'  # requests / seconds
+BUCKET_TTL = 24 * 60 * 60  # seconds without request before a bucket is removed
+
+
+class VendorEvalRateLimit(models.Model):
+    """
+    Represents a token bucket used to rate limit the evaluation routes.
+    The buckets are stored in an unlogged PostgreSQL table, so they are
+    shared by all the worker processes without the cost of WAL logging. Each
+    bucket holds the tokens left for one user on one route: tokens refill
+    continuously at `capacity / period` per second, up to `capacity`, and
+    each request takes one.
+    """
+    _name = 'vem.rate.limit'
+    _description = 'Evaluation Rate Limit Bucket'
+    _auto = False
+    _log_access = False
+
+    key = fields.Char(string='Key', readonly=True)
+    tokens = fields.Float(string='Tokens', readonly=True)
+    updated_at = fields.Datetime(string='Updated At', readonly=True)
+
+    def init(self):
+        """
+        Creates the unlogged table holding the buckets.
+        """
+        self.env.cr.execute("""
+            CREATE UNLOGGED TABLE IF NOT EXISTS vem_rate_limit (
+                id SERIAL PRIMARY KEY,
+                key VARCHAR NOT NULL UNIQUE,
+                tokens DOUBLE PRECISION NOT NULL,
+                updated_at TIMESTAMP NOT NULL
+            )
+        """)
+
+    @api.model
+    def _get_limit(self, route):
+        """
+        Returns the rate limit configured for a route.
+        The limit is read from the `tpm_score_summary.rate_limit.<route>`
+        system parameter, formatted as `<requests>/<seconds>`.
+        Args:
+            route (str): The name of the route.
+        Returns:
+            tuple: The capacity of the bucket and its refill period in
+                   seconds.
+        """
+        value = self.env['ir.config_parameter'].sudo().get_param(
+            f'tpm_score_summary.rate_limit.{route}', DEFAULT_RATE_LIMIT)
+        try:
+            capacity, period = (float(part) for part in value.split('/'))
+            if capacity > 0 and period > 0:
+                return capacity, period
+        except ValueError:
+            pass
+        _logger.warning("Invalid rate limit %r for route %s, using %s", value, route, DEFAULT_RATE_LIMIT)
+        capacity, period = DEFAULT_RATE_LIMIT.split('/')
+        return float(capacity), float(period)
+
+    @api.model
+    def _consume(self, route, user_id):
+        """
+        Takes a token from the bucket of a user on a route.
+        The refill and the withdrawal happen in one statement, on a separate
+        short transaction, so the bucket row is not kept locked for the
+        duration of the request and concurrent requests of every worker see
+        the latest state. The transaction is opened on a connection of the
+        database pool rather than a registry cursor, so it is a fresh
+        transaction whose isolation level can be set, also while tests run.
+        Args:
+            route (str): The name of the route.
+            user_id (int): The ID of the user.
+        Returns:
+            bool: True if a token was available, False if the user exceeded
+                  the rate limit.
+        """
+        capacity, period = self._get_limit(route)
+        with db_connect(self.env.cr.dbname).cursor() as cr:
+            cr.execute("SET TRANSACTION ISOLATION LEVEL READ COMMITTED")
+            cr.execute("""
+                INSERT INTO vem_rate_limit AS bucket (key, tokens, updated_at)
+                     VALUES (%(key)s, %(capacity)s - 1, CLOCK_TIMESTAMP() AT TIME ZONE 'UTC')
+                ON CONFLICT (key) DO UPDATE
+                        SET tokens = LEAST(%(capacity)s, bucket.tokens + %(rate)s * EXTRACT(
+                                         EPOCH FROM EXCLUDED.updated_at - bucket.updated_at)) - 1,
+                            updated_at = EXCLUDED.updated_at
+                      WHERE LEAST(%(capacity)s, bucket.tokens + %(rate)s * EXTRACT(
+                                EPOCH FROM EXCLUDED.updated_at - bucket.updated_at)) >= 1
+                  RETURNING tokens
+            """, {
+                'key': f'{route}:{user_id}',
+                'capacity': capacity,
+                'rate': capacity / period,
+            })
+            return bool(cr.fetchone())
+
+    @api.model
+    def _gc_buckets(self):
+        """
+        Removes the buckets that have not been used for a day.
+        A bucket left unused for that long is full again, so removing it
+        does not change the limits while keeping the table small.
+        """
+        self.env.cr.execute("""
+            DELETE FROM vem_rate_limit
+                  WHERE updated_at < (NOW() AT TIME ZONE 'UTC') - make_interval(secs => %s)
+        """, [BUCKET_TTL])
+        _logger.info("Removed %s unused rate limit buckets", self.env.cr.rowcount)
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+from datetime import timedelta
+
+from odoo import models, fields, api, Command
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+REPORT_JOB_BATCH_SIZE = 5  # jobs processed per cron run before rescheduling
+REPORT_JOB_TIMEOUT = 2 * 60 * 60  # seconds without progress before a running job is considered dead
+
+
+class VendorEvalReportJob(models.Model):
+    """
+    Represents the background generation of a multi-evaluation summary
+    report.
+    Summaries of many evaluations take longer to build than an HTTP worker
+    may spend on a request, so they are queued and built by a cron job: the
+    score cube and statistics are computed, the summary is rendered as PDF
+    (or HTML when wkhtmltopdf is not available) and stored as an attachment
+    of the job, and the requesting user is notified.
+    """
+    _name = 'vem.report.job'
+    _description = 'Summary Report Job'
+    _order = 'create_date desc, id desc'
+
+    name = fields.Char(
+        string='Report',
+        required=True,
+        readonly=True
+    )
+    user_id = fields.Many2one(
+        'res.users',
+        string='Requested By',
+        required=True,
+        readonly=True,
+        default=lambda self: self.env.user,
+        ondelete='cascade'
+    )
+    evaluation_ids = fields.Many2many(
+        'vem.evaluation',
+        string='Evaluations',
+        readonly=True
+    )
+    state = fields.Selection([
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status', default='queued', required=True, readonly=True)
+    progress = fields.Integer(
+        string='Progress',
+        readonly=True,
+        help='Percentage of the report generated'
+    )
+    attachment_id = fields.Many2one(
+        'ir.attachment',
+        string='Report File',
+        readonly=True
+    )
+    error = fields.Text(
+        string='Error',
+        readonly=True
+    )
+    date_done = fields.Datetime(
+        string='Done On',
+        readonly=True
+    )
+
+    @api.model
+    def _enqueue(self, evaluations):
+        """
+        Queues the generation of the summary report of evaluations.
+        When the user already has a queued or running job for the same
+        evaluations, that job is returned instead, so reloading the summary
+        page or clicking the button again does not queue the same report
+        several times.
+        Args:
+            evaluations (recordset): The evaluations to summarize.
+        Returns:
+            recordset: The queued job.
+        """
+        if not evaluations:
+            raise UserError("Vui lòng chọn ít nhất một đánh giá để xem tổng hợp.")
+        evaluations.check_access('read')
+
+        pending = self.search([
+            ('user_id', '=', self.env.uid),
+            ('state', 'in', ('queued', 'running')),
+            ('evaluation_ids', 'in', evaluations.ids),
+        ])
+        job = pending.filtered(lambda job: set(job.evaluation_ids.ids) == set(evaluations.ids))[:1]
+        if job:
+            return job
+
+        job = self.create({
+            'name': f'TPM Summary ({len(evaluations)} evaluations)',
+            'evaluation_ids': [Command.set(evaluations.ids)],
+        })
+        self.env.ref('tpm_score_summary.ir_cron_process_report_jobs').sudo()._trigger()
+        return job
+
+    @api.model
+    def _process_jobs(self):
+        """
+        Generates the reports of the queued jobs.
+        This is run by the report cron job. Each job is committed on its
+        own, so the progress of a job is visible while it runs and a failing
+        job does not prevent the others from being generated. The cron job
+        is rescheduled while queued jobs remain. Jobs left running by a
+        worker that was killed are marked as failed first.
+        """
+        self._fail_stale_jobs()
+        jobs = self.search([('state', '=', 'queued')], order='id', limit=REPORT_JOB_BATCH_SIZE)
+        remaining = self.search_count([('state', '=', 'queued')]) - len(jobs)
+        for job in jobs:
+            job._generate()
+        self.env['ir.cron']._notify_progress(done=len(jobs), remaining=remaining)
+
+    @api.model
+    def _get_stale_domain(self):
+        """
+        Returns the domain of the running jobs without progress for longer
+        than `REPORT_JOB_TIMEOUT`.
+        The progress of a running job is committed at each step, so such a
+        job was interrupted, e.g. by the time limit of the cron worker or by
+        a restart of the server.
+        Returns:
+            list: A search domain.
+        """
+        cutoff = fields.Datetime.now() - timedelta(seconds=REPORT_JOB_TIMEOUT)
+        return [('state', '=', 'running'), ('write_date', '<', cutoff)]
+
+    @api.model
+    def _fail_stale_jobs(self):
+        """
+        Marks the interrupted running jobs as failed, so they can be retried.
+        """
+        stale = self.search(self._get_stale_domain())
+        if stale:
+            _logger.warning("Summary report jobs %s were interrupted", stale.ids)
+            stale.write({'state': 'failed', 'error': 'The generation of the report was interrupted.'})
+            for job in stale:
+                job._notify_user("The report %s could not be generated." % job.name, 'danger')
+
+    def _generate(self):
+        """
+        Generates the report of the job as the user who requested it.
+        """
+        self.ensure_one()
+        self._set_progress('running', 0)
+        try:
+            evaluations = self.evaluation_ids.with_user(self.user_id).exists()
+            evaluations.check_access('read')
+
+            # Building the summary fills the summary cache used by the report
+            evaluations.get_multi_evaluation_summary(evaluations.ids)
+            self._set_progress('running', 40)
+
+            content, extension, mimetype = self._render_report(evaluations)
+            self._set_progress('running', 90)
+
+            attachment = self.env['ir.attachment'].sudo().create({
+                'name': f'tpm_summary_{self.id}.{extension}',
+                'raw': content,
+                'mimetype': mimetype,
+                'res_model': self._name,
+                'res_id': self.id,
+            })
+            self.write({
+                'state': 'done',
+                'progress': 100,
+                'attachment_id': attachment.id,
+                'date_done': fields.Datetime.now(),
+            })
+            self.env.cr.commit()
+            self._notify_user("The report %s is ready." % self.name, 'success')
+
+        except Exception as e:
+            self.env.cr.rollback()
+            _logger.exception("Error generating summary report job %s", self.id)
+            self.write({'state': 'failed', 'error': str(e)})
+            self.env.cr.commit()
+            self._notify_user("The report %s could not be generated." % self.name, 'danger')
+
+    def _set_progress(self, state, progress):
+        """
+        Updates and commits the state and progress of the job.
+        Args:
+            state (str): The state of the job.
+            progress (int): The percentage of the report generated.
+        """
+        self.write({'state': state, 'progress': progress})
+        self.env.cr.commit()
+
+    def _render_report(self, evaluations):
+        """
+        Renders the summary report of evaluations.
+        Args:
+            evaluations (recordset): The evaluations to summarize, in the
+                                     environment of the requesting user.
+        Returns:
+            tuple: The content of the report, its file extension and its
+                   mimetype.
+        """
+        Report = evaluations.env['ir.actions.report']
+        report_ref = 'tpm_score_summary.action_report_multi_summary'
+        if Report.get_wkhtmltopdf_state() == 'ok':
+            content, __ = Report._render_qweb_pdf(report_ref, evaluations.ids)
+            return content, 'pdf', 'application/pdf'
+        content, __ = Report._render_qweb_html(report_ref, evaluations.ids)
+        return content, 'html', 'text/html'
+
+    def _notify_user(self, message, notification_type):
+        """
+        Notifies the user who requested the job.
+        Args:
+            message (str): The message of the notification.
+            notification_type (str): The type of the notification, e.g.
+                                     'success' or 'danger'.
+        """
+        self.env['bus.bus']._sendone(self.user_id.partner_id, 'simple_notification', {
+            'title': 'TPM Summary',
+            'message': message,
+            'type': notification_type,
+            'sticky': notification_type == 'danger',
+        })
+
+    def action_download(self):
+        """
+        Downloads the generated report.
+        Returns:
+            dict: An action downloading the report file.
+        """
+        self.ensure_one()
+        if not self.attachment_id:
+            raise UserError("The report is not ready yet.")
+        return {
+            'type': 'ir.actions.act_url',
+            'url': f'/web/content/{self.attachment_id.id}?download=true',
+            'target': 'self',
+        }
+
+    def action_retry(self):
+        """
+        Queues the failed and the interrupted running jobs again.
+        """
+        stale = self.filtered_domain(self._get_stale_domain())
+        if self.filtered(lambda job: job.state == 'running') - stale:
+            raise UserError("The report is still being generated.")
+        (self.filtered(lambda job: job.state == 'failed') | stale).write(
+            {'state': 'queued', 'progress': 0, 'error': False})
+        self.env.ref('tpm_score_summary.ir_cron_process_report_jobs').sudo()._trigger()
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+from odoo import models, api
+
+from .evaluation_total import SCORE_MAX
+
+_logger = logging.getLogger(__name__)
+
+
+class VendorEvalScoreService(models.AbstractModel):
+    """
+    Saves the scores of the evaluation matrix.
+    This is the single write path of the scores: the `save_score` RPC method
+    and the save routes of the matrix only adapt their parameters and
+    responses to it. The evaluation is checked, the cells are validated, the
+    scores are upserted and the running totals are updated with the score
+    deltas, in a fixed number of queries whatever the number of cells.
+    """
+    _name = 'vem.score.service'
+    _description = 'Evaluation Score Service'
+
+    @api.model
+    def _save_scores(self, evaluation_id, cells):
+        """
+        Saves the scores of some cells of a draft evaluation.
+        Args:
+            evaluation_id (int): The ID of the evaluation.
+            cells (list): A list of dictionaries containing the question_id,
+                          vendor_id and score of each cell, and optionally
+                          the version of the line the score was based on.
+        Returns:
+            dict: The saved lines, the cells that were rejected, and the
+                  updated vendor totals, or an error when the evaluation
+                  cannot be modified. Cells rejected because their line
+                  changed since the given version come with the current
+                  state of the line.
+        Raises:
+            AccessError: If the user cannot modify the evaluation.
+        """
+        evaluation = self.env['vem.evaluation'].browse(evaluation_id)
+        state, vendor_ids = self._read_evaluation(evaluation)
+        if state is None:
+            return {'success': False, 'error': 'Evaluation not found'}
+        if state != 'draft':
+            return {'success': False, 'error': 'Cannot modify evaluation in current state'}
+        evaluation.check_access('write')
+
+        valid_cells, errors = self._validate_cells(cells, vendor_ids)
+
+        Line = self.env['vem.evaluation.line']
+        saved, vendor_totals = Line._upsert_scores(evaluation, valid_cells)
+        _logger.debug("Saved %s scores of evaluation %s", len(saved), evaluation_id)
+
+        saved_keys = {(question_id, vendor_id) for __, question_id, vendor_id, __, __ in saved}
+        unsaved = [cell for cell in valid_cells if (cell[0], cell[1]) not in saved_keys]
+        current = Line._read_cells(evaluation, [(cell[0], cell[1]) for cell in unsaved if cell[3] is not None])
+        for question_id, vendor_id, score, version in unsaved:
+            error = {'cell': {'question_id': question_id, 'vendor_id': vendor_id, 'score': score}}
+            line = current.get((question_id, vendor_id))
+            if line:
+                line_id, current_score, current_version = line
+                error.update(error='Score changed by another user', conflict=True, line={
+                    'line_id': line_id, 'score': current_score, 'version': current_version,
+                })
+            else:
+                error['error'] = 'Question not found'
+            errors.append(error)
+
+        return {
+            'success': True,
+            'lines': [
+                {'line_id': line_id, 'question_id': question_id, 'vendor_id': vendor_id,
+                 'score': score, 'version': version}
+                for line_id, question_id, vendor_id, score, version in saved
+            ],
+            'errors': errors,
+            'vendor_totals': vendor_totals,
+        }
+
+    @api.model
+    def _read_evaluation(self, evaluation):
+        """
+        Reads the state and the vendors of an evaluation with one query.
+        Args:
+            evaluation (recordset): The evaluation.
+        Returns:
+            tuple: The state of the evaluation, None if it does not exist,
+                   and the set of the IDs of its vendors.
+        """
+        evaluation.flush_recordset(['state', 'vendor_ids'])
+        self.env.cr.execute("""
+            SELECT evaluation.state,
+                   ARRAY(SELECT rel.vem_vendor_id
+                           FROM vem_evaluation_vem_vendor_rel rel
+                          WHERE rel.vem_evaluation_id = evaluation.id)
+              FROM vem_evaluation evaluation
+             WHERE evaluation.id = %s
+        """, [evaluation.id])
+        row = self.env.cr.fetchone()
+        if not row:
+            return None, set()
+        return row[0], set(row[1])
+
+    @api.model
+    def _validate_cells(self, cells, vendor_ids):
+        """
+        Validates the cells to save.
+        Args:
+            cells (list): The cells received by `_save_scores`.
+            vendor_ids (set): The IDs of the vendors of the evaluation.
+        Returns:
+            tuple: The list of (question_id, vendor_id, score, version)
+                   tuples of the valid cells, and the list of the errors of
+                   the other cells.
+        """
+        valid_cells = []
+        errors = []
+        for cell in cells:
+            try:
+                question_id = int(cell['question_id'])
+                vendor_id = int(cell['vendor_id'])
+                score = int(cell['score'])
+                version = None if cell.get('version') is None else int(cell['version'])
+            except (KeyError, ValueError, TypeError, AttributeError):
+                errors.append({'cell': cell, 'error': 'Invalid cell'})
+                continue
+            if not (1 <= score <= SCORE_MAX):
+                errors.append({'cell': cell, 'error': f'Score must be between 1 and {SCORE_MAX}'})
+            elif vendor_id not in vendor_ids:
+                errors.append({'cell': cell, 'error': 'Vendor not in evaluation'})
+            else:
+                valid_cells.append((question_id, vendor_id, score, version))
+        return valid_cells, errors
@@ -33,9 +33,18 @@ class VendorEvalVendor(models.Model):
         string='Notes',
         help='Additional notes about the team'
     )
+    evaluation_ids = fields.Many2many(
+        'vem.evaluation',
+        'vem_evaluation_vem_vendor_rel',
+        'vem_vendor_id',
+        'vem_evaluation_id',
+        string='Evaluations',
+        help='Evaluations this team is part of'
+    )
     evaluation_count = fields.Integer(
         string='Evaluation Count',
         compute='_compute_evaluation_count',
+        store=True,
         help='Number of evaluations this team is part of'
     )
 
@@ -44,16 +53,18 @@ class VendorEvalVendor(models.Model):
         ('code_unique', 'UNIQUE(code)', 'Team code must be unique!')
     ]
 
-    @api.depends('name')
+    @api.depends('evaluation_ids')
     def _compute_evaluation_count(self):
         """
         Computes the number of evaluations this vendor is a part of.
-        This method counts the number of evaluation lines that are associated
-        with the current vendor and sets the `evaluation_count` field
-        accordingly.
+        The evaluations of the whole recordset are counted with one grouped
+        query. The count is stored, and only the vendors added to or removed
+        from an evaluation are recomputed.
         """
+        counts = dict(self.env['vem.evaluation'].sudo()._read_group(
+            [('vendor_ids', 'in', self.ids)],
+            ['vendor_ids'],
+            ['__count'],
+        ))
         for vendor in self:
-            count = self.env['vem.evaluation.line'].search_count([
-                ('vendor_id', '=', vendor.id)
-            ])
-            vendor.evaluation_count = count
+            vendor.evaluation_count = counts.get(vendor._origin, 0)
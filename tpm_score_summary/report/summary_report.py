@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, api
+
+
+class ReportMultiSummary(models.AbstractModel):
+    """
+    Provides the values of the printable multi-evaluation summary.
+    """
+    _name = 'report.tpm_score_summary.report_multi_summary'
+    _description = 'TPM Evaluation Summary Report'
+
+    @api.model
+    def _get_report_values(self, docids, data=None):
+        """
+        Returns the values of the summary report of evaluations.
+        Args:
+            docids (list): The IDs of the evaluations to summarize.
+            data (dict): Additional report data.
+        Returns:
+            dict: The values of the report template.
+        """
+        evaluations = self.env['vem.evaluation'].browse(docids)
+        return {
+            'doc_ids': docids,
+            'doc_model': 'vem.evaluation',
+            'docs': evaluations,
+            'summary_data': self.env['vem.evaluation'].get_multi_evaluation_summary(docids),
+        }
@@ -1,16 +1,37 @@
 /** @odoo-module **/
 
+import { deleteEntry, loadEntries, outboxKey, putEntry } from "@tpm_score_summary/js/score_outbox";
+
 // Evaluation Matrix functionality for vendor evaluation
-let saveQueue = [];
+let saveQueue = new Map(); // Pending score updates keyed by cell, mirrored in the durable outbox
 let isProcessingQueue = false;
 let debounceTimers = {};
 let lastSaveTime = {}; // Track last save time for each input
 let pendingChanges = {}; // Track pending changes that haven't been processed
 
-// Add rate limiting and concurrency control
-const RATE_LIMIT_WINDOW = 2000; // 2 seconds window
-const MAX_REQUESTS_PER_WINDOW = 5; // Maximum 5 requests per window
-const requestCounts = new Map();
+// Batching of score saves
+const BATCH_DELAY = 300; // Wait for more edits before sending a batch
+const MAX_BATCH_SIZE = 500; // Maximum number of cells sent in one request
+const RETRY_DELAY = 1000; // First delay before sending a failed batch again
+const MAX_RETRY_DELAY = 60000; // Longest delay between two attempts
+let failedAttempts = 0;
+let retryTimer = null;
+
+// Row virtualization of the matrix
+const ROW_HEIGHT = 64; // Fixed height of a question row in pixels, see .vem-matrix-row
+const OVERSCAN_ROWS = 10; // Rows rendered above and below the visible ones
+const matrix = {
+    evaluationId: null,
+    editable: false,
+    vendorIds: [],
+    rowCount: 0,
+    pageSize: 50,
+    pages: new Map(), // Loaded rows keyed by page index, null while loading
+    rowIndexes: new Map(), // Row index keyed by question ID
+    renderedRange: null,
+    renderScheduled: false,
+};
+let draftValues = {}; // Values typed in the inputs, kept while rows are scrolled out of view
 
 $(document).ready(function() {
     // Wait for DOM to be fully loaded
@@ -46,6 +67,18 @@ function initializeEvaluationMatrix() {
     // Mark as initialized
     $matrix.data('initialized', true);
 
+    initializeVirtualRows($matrix, evaluationId);
+    restoreOutbox(evaluationId);
+
+    // Send the queued scores as soon as the network is back
+    $(window).off('online.matrix').on('online.matrix', function() {
+        if (retryTimer) {
+            clearTimeout(retryTimer);
+            retryTimer = null;
+            processQueue();
+        }
+    });
+
     // Initialize score change handlers with longer debouncing
     $(document).off('input.matrix change.matrix', '.score-input').on('input.matrix change.matrix', '.score-input', function(event) {
         const $input = $(event.currentTarget);
@@ -56,6 +89,9 @@ function initializeEvaluationMatrix() {
             clearTimeout(debounceTimers[inputId]);
         }
 
+        // Keep the typed value for when the row is rendered again
+        draftValues[inputId] = $input.val();
+
         // Store the pending change
         pendingChanges[inputId] = {
             $input: $input,
@@ -79,6 +115,309 @@ function initializeEvaluationMatrix() {
         handleSubmitEvaluation($(event.currentTarget), evaluationId);
     });
 }
+/**
+ * Initializes the row virtualization of the matrix.
+ * The server only sends the team headers, the totals and the first page of
+ * rows. The rows are rendered while they are scrolled into view, and the
+ * pages they belong to are loaded on demand.
+ * @param {jQuery} $matrix - The jQuery object for the matrix table.
+ * @param {number} evaluationId - The ID of the evaluation.
+ */
+function initializeVirtualRows($matrix, evaluationId) {
+    matrix.evaluationId = evaluationId;
+    matrix.editable = String($matrix.data('editable')) === '1';
+    matrix.rowCount = parseInt($matrix.data('row-count')) || 0;
+    matrix.pageSize = parseInt($matrix.data('page-size')) || 50;
+    matrix.vendorIds = $matrix.find('.vem-team-header').map(function() {
+        return parseInt($(this).data('vendor-id'));
+    }).get();
+
+    const firstPage = $matrix.data('first-page');
+    if (firstPage && firstPage.rows) {
+        storePage(0, firstPage.rows);
+    }
+
+    $matrix.closest('.vem-matrix-viewport').off('scroll.matrix').on('scroll.matrix', scheduleRender);
+    $(window).off('resize.matrix').on('resize.matrix', scheduleRender);
+    renderVisibleRows(true);
+}
+/**
+ * Schedules the rendering of the visible rows for the next animation frame.
+ * Scroll events fire much more often than the screen refreshes, so the rows
+ * are rendered at most once per frame.
+ */
+function scheduleRender() {
+    if (matrix.renderScheduled) {
+        return;
+    }
+    matrix.renderScheduled = true;
+    window.requestAnimationFrame(function() {
+        matrix.renderScheduled = false;
+        renderVisibleRows(false);
+    });
+}
+/**
+ * Stores the rows of a loaded page.
+ * @param {number} page - The index of the page.
+ * @param {Array} rows - The rows of the page.
+ */
+function storePage(page, rows) {
+    matrix.pages.set(page, rows);
+    rows.forEach(function(row, index) {
+        matrix.rowIndexes.set(row.question_id, page * matrix.pageSize + index);
+    });
+}
+/**
+ * Loads a page of rows from the server, unless it is loaded or loading.
+ * @param {number} page - The index of the page.
+ */
+function loadPage(page) {
+    if (matrix.pages.has(page)) {
+        return;
+    }
+    matrix.pages.set(page, null);
+
+    $.ajax({
+        url: '/vem/eval/' + matrix.evaluationId + '/rows',
+        type: 'POST',
+        dataType: 'json',
+        contentType: 'application/json',
+        data: JSON.stringify({
+            jsonrpc: "2.0",
+            method: "call",
+            params: { offset: page * matrix.pageSize, limit: matrix.pageSize },
+            id: Math.floor(Math.random() * 1000000000)
+        })
+    }).then(function(response) {
+        if (!response.result || !response.result.success) {
+            return $.Deferred().reject(response.result ? response.result.error : 'Server error occurred');
+        }
+        storePage(page, response.result.rows);
+        renderVisibleRows(true);
+    }).fail(function(error) {
+        console.error('Failed to load matrix rows:', error);
+        // Let the next scroll try again
+        matrix.pages.delete(page);
+    });
+}
+/**
+ * Returns a row of the matrix if its page is loaded.
+ * @param {number} index - The index of the row.
+ * @returns {object|null} The row, or null if its page is not loaded yet.
+ */
+function getRow(index) {
+    const rows = matrix.pages.get(Math.floor(index / matrix.pageSize));
+    return rows ? rows[index % matrix.pageSize] : null;
+}
+/**
+ * Renders the rows in view, plus a few above and below.
+ * The rows out of view are replaced with two spacer rows of the same total
+ * height, so the scroll bar reflects the whole matrix. The focused input is
+ * focused again after rendering.
+ * @param {boolean} force - Whether to render even if the visible rows did
+ *                          not change.
+ */
+function renderVisibleRows(force) {
+    const $viewport = $('#evaluation_matrix').closest('.vem-matrix-viewport');
+    if (!$viewport.length) {
+        return;
+    }
+
+    const scrollTop = $viewport.scrollTop();
+    const first = Math.max(0, Math.floor(scrollTop / ROW_HEIGHT) - OVERSCAN_ROWS);
+    const last = Math.min(matrix.rowCount, Math.ceil((scrollTop + $viewport.innerHeight()) / ROW_HEIGHT) + OVERSCAN_ROWS);
+    const range = first + ':' + last;
+    if (!force && matrix.renderedRange === range) {
+        return;
+    }
+    matrix.renderedRange = range;
+
+    for (let page = Math.floor(first / matrix.pageSize); page * matrix.pageSize < last; page++) {
+        loadPage(page);
+    }
+
+    const focused = document.activeElement;
+    const focusedId = $(focused).hasClass('score-input') && $(focused).closest('#evaluation_matrix_rows').length
+        ? $(focused).data('question-id') + '_' + $(focused).data('vendor-id')
+        : null;
+
+    const columnCount = matrix.vendorIds.length + 1;
+    const fragment = document.createDocumentFragment();
+    fragment.appendChild(buildSpacerRow(first * ROW_HEIGHT, columnCount)[0]);
+    for (let index = first; index < last; index++) {
+        fragment.appendChild(buildRow(getRow(index), columnCount)[0]);
+    }
+    fragment.appendChild(buildSpacerRow((matrix.rowCount - last) * ROW_HEIGHT, columnCount)[0]);
+    $('#evaluation_matrix_rows').empty().append(fragment);
+
+    if (focusedId) {
+        const [questionId, vendorId] = focusedId.split('_');
+        findScoreCell(questionId, vendorId).find('.score-input').trigger('focus');
+    }
+}
+/**
+ * Builds a spacer row standing for rows that are not rendered.
+ * @param {number} height - The height of the spacer in pixels.
+ * @param {number} columnCount - The number of columns of the matrix.
+ * @returns {jQuery} The spacer row.
+ */
+function buildSpacerRow(height, columnCount) {
+    return $('<tr>').addClass('vem-matrix-spacer').append(
+        $('<td>').attr('colspan', columnCount).css('height', height + 'px')
+    );
+}
+/**
+ * Builds the row of a question.
+ * The value of each cell is the value typed by the user if any, otherwise
+ * the saved score.
+ * @param {object|null} row - The row, or null if its page is not loaded yet.
+ * @param {number} columnCount - The number of columns of the matrix.
+ * @returns {jQuery} The row.
+ */
+function buildRow(row, columnCount) {
+    const $row = $('<tr>').addClass('vem-matrix-row');
+    if (!row) {
+        return $row.addClass('vem-row-loading').append(
+            $('<td>').attr('colspan', columnCount).text('Loading...')
+        );
+    }
+
+    $row.append($('<td>').addClass('vem-question-cell').append(
+        $('<span>').addClass('vem-question-text').attr('title', row.question_name).text(row.question_name)
+    ));
+    matrix.vendorIds.forEach(function(vendorId, column) {
+        const cell = row.cells[column];
+        const inputId = row.question_id + '_' + vendorId;
+        const score = cell ? cell[1] : 1;
+        const $cell = $('<td>').addClass('vem-team-cell').attr({
+            'data-question-id': row.question_id,
+            'data-vendor-id': vendorId,
+        });
+
+        if (matrix.editable) {
+            $cell.append($('<input>').attr({
+                type: 'number',
+                min: 1,
+                max: 5,
+                step: 1,
+                placeholder: '1-5',
+                'data-question-id': row.question_id,
+                'data-vendor-id': vendorId,
+                'data-line-id': cell ? cell[0] : 0,
+            }).addClass('form-control score-input')
+                .toggleClass('pending', saveQueue.has(inputId))
+                .val(inputId in draftValues ? draftValues[inputId] : score));
+        } else {
+            $cell.append($('<span>').addClass('badge vem-badge vem-badge-primary vem-score-display').text(score));
+        }
+        $row.append($cell);
+    });
+    return $row;
+}
+/**
+ * Returns the rendered cell of a question and vendor.
+ * @param {number} questionId - The ID of the question.
+ * @param {number} vendorId - The ID of the vendor.
+ * @returns {jQuery} The cell, empty if its row is not rendered.
+ */
+function findScoreCell(questionId, vendorId) {
+    return $('.vem-team-cell[data-question-id="' + questionId + '"][data-vendor-id="' + vendorId + '"]');
+}
+/**
+ * Returns the loaded state of a cell.
+ * @param {number} questionId - The ID of the question.
+ * @param {number} vendorId - The ID of the vendor.
+ * @returns {object|null} An object with the row and the column of the cell,
+ *                        or null if its row is not loaded.
+ */
+function getCell(questionId, vendorId) {
+    const index = matrix.rowIndexes.get(parseInt(questionId));
+    const row = index === undefined ? null : getRow(index);
+    const column = matrix.vendorIds.indexOf(parseInt(vendorId));
+    return row && column >= 0 ? { row, column } : null;
+}
+/**
+ * Stores a saved score in the loaded rows.
+ * @param {number} questionId - The ID of the question.
+ * @param {number} vendorId - The ID of the vendor.
+ * @param {number} score - The saved score.
+ * @param {number} [lineId] - The ID of the line, if known.
+ * @param {number} [version] - The version of the line, if known.
+ */
+function storeScore(questionId, vendorId, score, lineId, version) {
+    const found = getCell(questionId, vendorId);
+    if (!found) {
+        return;
+    }
+    const cell = found.row.cells[found.column];
+    found.row.cells[found.column] = [
+        lineId || (cell ? cell[0] : 0),
+        score,
+        version || (cell ? cell[2] : 0),
+    ];
+}
+/**
+ * Returns the version of the line of a cell known by the page.
+ * @param {number} questionId - The ID of the question.
+ * @param {number} vendorId - The ID of the vendor.
+ * @returns {number|null} The version, 0 if the line does not exist, or null
+ *                        if the row of the cell is not loaded.
+ */
+function getCellVersion(questionId, vendorId) {
+    const found = getCell(questionId, vendorId);
+    if (!found) {
+        return null;
+    }
+    const cell = found.row.cells[found.column];
+    return cell ? cell[2] : 0;
+}
+/**
+ * Restores the edits of the evaluation left in the outbox.
+ * The edits that were not confirmed by the server before the page was
+ * closed or the network was lost are shown in their cells and queued again.
+ * They are discarded when the evaluation can no longer be edited.
+ * @param {number} evaluationId - The ID of the evaluation.
+ */
+function restoreOutbox(evaluationId) {
+    loadEntries(evaluationId).then(function(entries) {
+        if (!matrix.editable) {
+            entries.forEach(deleteEntry);
+            return;
+        }
+        let restored = 0;
+        entries.forEach(function(entry) {
+            const inputId = entry.questionId + '_' + entry.vendorId;
+            if (saveQueue.has(inputId)) {
+                return; // Edited again since the page was loaded
+            }
+            saveQueue.set(inputId, Object.assign({}, entry, {
+                $input: findScoreCell(entry.questionId, entry.vendorId).find('.score-input'),
+            }));
+            draftValues[inputId] = entry.score;
+            restored++;
+        });
+        if (restored) {
+            renderVisibleRows(true);
+            scheduleFlush(0);
+        }
+    });
+}
+/**
+ * Returns the outbox entry of a queued update.
+ * @param {object} update - The queued update.
+ * @returns {object} The entry, without the DOM references of the update.
+ */
+function toEntry(update) {
+    return {
+        key: update.key,
+        evaluationId: update.evaluationId,
+        questionId: update.questionId,
+        vendorId: update.vendorId,
+        score: update.score,
+        version: update.version,
+        updatedAt: update.updatedAt,
+    };
+}
 /**
  * Validates a score to ensure it is a whole number between 1 and 5.
  * @param {string} score - The score to validate.
@@ -105,52 +444,16 @@ function validateScore(score) {
 
     return { valid: true, score: numScore };
 }
-/**
- * Checks if a request should be rate-limited.
- * This function implements a simple rate limiting mechanism to prevent
- * excessive server requests from a single input field.
- * @param {string} inputId - The ID of the input field to check.
- * @returns {boolean} True if the request should be rate-limited, false
- *                    otherwise.
- */
-function isRateLimited(inputId) {
-    const now = Date.now();
-    const windowStart = now - RATE_LIMIT_WINDOW;
-
-    // Clean up old entries
-    for (const [key, data] of requestCounts) {
-        if (data.timestamp < windowStart) {
-            requestCounts.delete(key);
-        }
-    }
-
-    // Get or initialize request count for this input
-    const data = requestCounts.get(inputId) || { count: 0, timestamp: now };
-
-    if (data.timestamp < windowStart) {
-        data.count = 1;
-        data.timestamp = now;
-    } else if (data.count >= MAX_REQUESTS_PER_WINDOW) {
-        return true;
-    } else {
-        data.count++;
-    }
-
-    requestCounts.set(inputId, data);
-    return false;
-}
-
 /**
  * Validates a score input and handles the change.
  * This function is called when a score input changes. It validates the new
- * score, and if it is valid, it either saves the score immediately or queues
- * it for later if the rate limit has been exceeded.
+ * score, and if it is valid, it queues the score to be saved with the next
+ * batch.
  * @param {jQuery} $input - The jQuery object for the score input.
  * @param {number} evaluationId - The ID of the evaluation.
  */
 function validateAndHandleScoreChange($input, evaluationId) {
     const inputValue = $input.val().trim();
-    const inputId = $input.data('question-id') + '_' + $input.data('vendor-id');
 
     // Clear previous validation states
     $input.removeClass('success error invalid');
@@ -168,172 +471,288 @@ function validateAndHandleScoreChange($input, evaluationId) {
     // Optimistic UI update
     $input.addClass('pending');
 
-    // Check rate limiting
-    if (isRateLimited(inputId)) {
-        console.log('Rate limited, queuing update');
-        queueScoreUpdate($input, evaluationId, validation.score);
-        return;
-    }
-
-    saveScore($input, evaluationId, validation.score);
+    queueScoreUpdate($input, evaluationId, validation.score);
 }
 /**
- * Queues a score update to be processed later.
- * This function is used when the rate limit has been exceeded. It adds the
- * score update to a queue, which is processed asynchronously.
+ * Queues a score update to be saved with the next batch.
+ * Updates are keyed by cell, so editing the same cell several times before
+ * the batch is sent only saves the latest score. The update is also stored
+ * in the durable outbox until the server confirms it, along with the
+ * version of the line it is based on.
  * @param {jQuery} $input - The jQuery object for the score input.
  * @param {number} evaluationId - The ID of the evaluation.
  * @param {number} score - The score to be saved.
  */
 function queueScoreUpdate($input, evaluationId, score) {
-    const updateData = {
+    const questionId = $input.data('question-id');
+    const vendorId = $input.data('vendor-id');
+    const inputId = questionId + '_' + vendorId;
+    const previous = saveQueue.get(inputId);
+
+    const update = {
+        key: outboxKey(evaluationId, questionId, vendorId),
         $input,
         evaluationId,
+        questionId,
+        vendorId,
         score,
-        timestamp: Date.now()
+        // The queued edits of a cell are all based on the line the first one saw
+        version: previous ? previous.version : getCellVersion(questionId, vendorId),
+        updatedAt: Date.now()
     };
-
-    saveQueue.push(updateData);
-
+    saveQueue.set(inputId, update);
+    putEntry(toEntry(update));
+    scheduleFlush(BATCH_DELAY);
+}
+/**
+ * Schedules the sending of the queued updates, unless it is scheduled or
+ * in progress.
+ * @param {number} delay - The delay before sending, in milliseconds.
+ */
+function scheduleFlush(delay) {
     if (!isProcessingQueue) {
-        processQueue();
+        isProcessingQueue = true;
+        setTimeout(processQueue, delay);
     }
 }
 /**
  * Processes the queue of score updates.
- * This function is called asynchronously to process the score updates that
- * have been queued due to rate limiting. It processes one update at a time
- * and then schedules itself to run again after a delay.
+ * All the queued updates are coalesced into a single batch request. Edits
+ * made while a batch is in flight are sent with the next one. When a batch
+ * cannot be sent, or the server is busy, it is sent again after an
+ * exponentially growing delay, or as soon as the browser is back online.
  */
 function processQueue() {
-    if (saveQueue.length === 0) {
+    retryTimer = null;
+    if (saveQueue.size === 0) {
         isProcessingQueue = false;
         return;
     }
 
     isProcessingQueue = true;
-    const update = saveQueue[0];
 
-    if (!isRateLimited(update.$input.data('question-id') + '_' + update.$input.data('vendor-id'))) {
-        saveQueue.shift();
-        saveScore(update.$input, update.evaluationId, update.score);
-    }
+    const batch = Array.from(saveQueue.values()).slice(0, MAX_BATCH_SIZE);
+    saveScores(batch[0].evaluationId, batch).then(function() {
+        failedAttempts = 0;
+        setTimeout(processQueue, 0);
+    }, function(error) {
+        failedAttempts++;
+        const delay = Math.min(MAX_RETRY_DELAY, RETRY_DELAY * Math.pow(2, failedAttempts - 1));
+        console.log(`Saving scores failed, retrying in ${delay}ms:`, error);
+        retryTimer = setTimeout(processQueue, delay * (0.5 + Math.random() / 2));
+    });
+}
+/**
+ * Updates the total displayed for each vendor.
+ * @param {object} vendorTotals - The new totals keyed by vendor ID.
+ */
+function updateVendorTotals(vendorTotals) {
+    Object.entries(vendorTotals || {}).forEach(function([vendorId, total]) {
+        $('#total_' + vendorId).text(total);
+    });
+}
 
-    // Process next item in queue after delay
-    setTimeout(processQueue, 500);
+/**
+ * Applies the score deltas published by other viewers of the matrix.
+ * Only the affected cells and totals are updated, and the scores of the rows
+ * out of view are updated in the loaded pages. Cells with local changes that
+ * are not saved yet, or that are being edited, are left untouched so the
+ * user's input is never overwritten.
+ * @param {Array} cells - The deltas, with the question_id, vendor_id, score
+ *                        and vendor_total of each saved cell.
+ */
+export function applyScoreDeltas(cells) {
+    const vendorTotals = {};
+    cells.forEach(function(cell) {
+        const inputId = cell.question_id + '_' + cell.vendor_id;
+        const $cell = findScoreCell(cell.question_id, cell.vendor_id);
+        const $input = $cell.find('.score-input');
+
+        if (cell.vendor_total !== null && cell.vendor_total !== undefined) {
+            vendorTotals[cell.vendor_id] = cell.vendor_total;
+        }
+        storeScore(cell.question_id, cell.vendor_id, cell.score, null, cell.version);
+        if (saveQueue.has(inputId) || pendingChanges[inputId] || $input.is(':focus')) {
+            return;
+        }
+        delete draftValues[inputId];
+        if ($input.length) {
+            $input.val(cell.score);
+        } else {
+            $cell.find('.vem-score-display').text(cell.score);
+        }
+    });
+    updateVendorTotals(vendorTotals);
 }
 
 /**
- * Saves a score to the server using an AJAX request.
- * This function sends the score to the server to be saved. It includes retry
- * logic with exponential backoff to handle network errors.
- * @param {jQuery} $input - The jQuery object for the score input.
+ * Saves a batch of scores to the server using an AJAX request.
+ * This function sends all the cells of the batch to the server in one
+ * request, each with the version of the line its score is based on. Cells
+ * whose line was changed by another user in the meantime are rejected by
+ * the server and take its current score. Cells that were edited again
+ * while the request was in flight stay queued. When the server refuses
+ * the whole batch for another reason than a rate limit, the cells are
+ * marked as failed and removed from the outbox, as sending them again
+ * would fail the same way.
  * @param {number} evaluationId - The ID of the evaluation.
- * @param {number} score - The score to be saved.
- * @returns {Promise} A promise that resolves when the score is saved
- *                    successfully.
+ * @param {Array} updates - The queued updates to be saved.
+ * @returns {Promise} A promise resolved when the server answered, and
+ *                    rejected when the batch could not be sent or should
+ *                    be sent again later.
  */
-function saveScore($input, evaluationId, score) {
-    const questionId = $input.data('question-id');
-    const vendorId = $input.data('vendor-id');
+function saveScores(evaluationId, updates) {
+    updates.forEach(function(update) {
+        currentInput(update).addClass('saving').removeClass('error success offline');
+    });
 
-    // Optimistic UI feedback
-    $input.addClass('saving').removeClass('error success');
+    // The row of a cell may have been rendered again since it was edited
+    function currentInput(update) {
+        const $input = findScoreCell(update.questionId, update.vendorId).find('.score-input');
+        return $input.length ? $input : update.$input;
+    }
+
+    function markFailed($input, message) {
+        $input.removeClass('saving pending').addClass('error');
+        const errorMessage = $('<div>')
+            .addClass('save-error-message')
+            .text(message)
+            .insertAfter($input);
+        setTimeout(() => errorMessage.fadeOut('slow', function() { $(this).remove(); }), 5000);
+    }
 
-    // Add session token to prevent CSRF issues
-    const session_info = odoo.session_info || {};
-    const csrf_token = session_info.csrf_token;
+    function settle(update) {
+        const inputId = update.questionId + '_' + update.vendorId;
+        // Keep the cell queued if it was edited again in the meantime
+        if (saveQueue.get(inputId) === update) {
+            saveQueue.delete(inputId);
+            deleteEntry(toEntry(update));
+            return true;
+        }
+        return false;
+    }
+
+    function rebase(update, version) {
+        // The newer edit of the cell is now based on the given version
+        const newer = saveQueue.get(update.questionId + '_' + update.vendorId);
+        if (newer && newer !== update) {
+            newer.version = version;
+            putEntry(toEntry(newer));
+        }
+    }
 
-    function attemptSave() {
-        return $.ajax({
-            url: '/web/dataset/call_kw/vem.evaluation/save_score',
-            type: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-                'X-CSRFToken': csrf_token
+    return $.ajax({
+        url: '/vem/eval/' + evaluationId + '/save_batch',
+        type: 'POST',
+        dataType: 'json',
+        contentType: 'application/json',
+        data: JSON.stringify({
+            jsonrpc: "2.0",
+            method: "call",
+            params: {
+                cells: updates.map(function(update) {
+                    return {
+                        question_id: update.questionId,
+                        vendor_id: update.vendorId,
+                        score: update.score,
+                        version: update.version
+                    };
+                })
             },
-            data: JSON.stringify({
-                jsonrpc: "2.0",
-                method: "call",
-                params: {
-                    model: 'vem.evaluation',
-                    method: 'save_score',
-                    args: [evaluationId, questionId, vendorId, score],
-                    kwargs: {}
-                },
-                id: Math.floor(Math.random() * 1000000000)
-            }),
-            success: function(response) {
-                if (response.error) {
-                    throw new Error(response.error.data.message || 'Server error occurred');
+            id: Math.floor(Math.random() * 1000000000)
+        })
+    }).then(function(response) {
+        if (response.error) {
+            return $.Deferred().reject(response.error.data.message || 'Server error occurred');
+        }
+        if (!response.result) {
+            return $.Deferred().reject('Server error occurred');
+        }
+        if (!response.result.success && response.result.retry) {
+            return $.Deferred().reject(response.result.error);
+        }
+        return response.result;
+    }).then(function(result) {
+        if (!result.success) {
+            updates.forEach(function(update) {
+                if (settle(update)) {
+                    markFailed(currentInput(update), result.error || 'Failed to save. Please try again.');
                 }
+            });
+            return;
+        }
+        const saved = {};
+        (result.lines || []).forEach(function(line) {
+            saved[line.question_id + '_' + line.vendor_id] = line;
+        });
+        const rejected = {};
+        (result.errors || []).forEach(function(item) {
+            rejected[item.cell.question_id + '_' + item.cell.vendor_id] = item;
+        });
+
+        updates.forEach(function(update) {
+            const inputId = update.questionId + '_' + update.vendorId;
+            const line = saved[inputId];
+            const error = rejected[inputId];
+
+            if (line) {
+                storeScore(update.questionId, update.vendorId, line.score, line.line_id, line.version);
+                if (!settle(update)) {
+                    rebase(update, line.version);
+                    return;
+                }
+                if (String(draftValues[inputId]) === String(update.score) && !pendingChanges[inputId]) {
+                    delete draftValues[inputId];
+                }
+                const $input = currentInput(update);
                 $input.removeClass('saving pending').addClass('success');
                 setTimeout(() => $input.removeClass('success'), 2000);
-            },
-            error: function(xhr, status, error) {
-                console.error('Save failed:', {
-                    status: xhr.status,
-                    statusText: xhr.statusText,
-                    responseText: xhr.responseText,
-                    error: error
-                });
-                throw new Error(error || 'Network error');
+            } else if (error && error.conflict) {
+                // Another user changed the score since it was edited here
+                storeScore(update.questionId, update.vendorId, error.line.score, error.line.line_id, error.line.version);
+                if (!settle(update)) {
+                    rebase(update, error.line.version);
+                    return;
+                }
+                delete draftValues[inputId];
+                const $input = currentInput(update);
+                $input.val(error.line.score);
+                markFailed($input, error.error);
+            } else if (settle(update)) {
+                markFailed(currentInput(update), error ? error.error : 'Failed to save. Please try again.');
             }
         });
-    }
-
-    // Implementation with better error handling and retry logic
-    let retryCount = 0;
-    const maxRetries = 3;
-    const backoffDelay = 1000; // Start with 1 second
-
-    function tryWithRetry() {
-        return attemptSave().catch(function(error) {
-            retryCount++;
-            if (retryCount < maxRetries) {
-                console.log(`Retry attempt ${retryCount} after error:`, error);
-                // Exponential backoff
-                const delay = backoffDelay * Math.pow(2, retryCount - 1);
-                return new Promise(resolve => setTimeout(resolve, delay))
-                    .then(tryWithRetry);
-            } else {
-                $input.removeClass('saving pending').addClass('error');
-                console.error('Failed to save score after ' + maxRetries + ' attempts:', error);
-                // Show error message to user
-                const errorMessage = $('<div>')
-                    .addClass('save-error-message')
-                    .text('Failed to save. Please try again.')
-                    .insertAfter($input);
-                setTimeout(() => errorMessage.fadeOut('slow', function() { $(this).remove(); }), 5000);
-                throw error;
-            }
+        updateVendorTotals(result.vendor_totals);
+    }, function(error) {
+        // The updates stay queued and in the outbox until they can be sent
+        updates.forEach(function(update) {
+            currentInput(update).removeClass('saving').addClass('offline');
         });
-    }
-
-    return tryWithRetry();
+        return $.Deferred().reject(error);
+    });
 }
 /**
- * Validates all scores on the page.
- * This function iterates through all score inputs and validates them. It
- * returns an object indicating whether all scores are valid and a list of
- * any invalid inputs.
+ * Validates all scores typed in the matrix.
+ * This function validates the values typed in every cell, including the
+ * cells of the rows that are not rendered. It returns an object indicating
+ * whether all scores are valid and a list of any invalid cells.
  * @returns {object} An object with a 'valid' boolean and a list of
  *                   'invalidInputs'.
  */
 function validateAllScores() {
-    let hasInvalidScores = false;
     const invalidInputs = [];
 
-    $('.score-input').each(function() {
-        const $input = $(this);
-        const value = $input.val().trim();
+    Object.entries(draftValues).forEach(function([inputId, value]) {
+        const [questionId, vendorId] = inputId.split('_');
+        const $input = findScoreCell(questionId, vendorId).find('.score-input');
+        value = String(value).trim();
 
         if (value) {
             const validation = validateScore(value);
             if (!validation.valid) {
-                hasInvalidScores = true;
                 invalidInputs.push({
                     element: $input,
+                    questionId: parseInt(questionId),
                     message: validation.message
                 });
                 $input.addClass('invalid');
@@ -343,7 +762,18 @@ function validateAllScores() {
         }
     });
 
-    return { valid: !hasInvalidScores, invalidInputs: invalidInputs };
+    return { valid: invalidInputs.length === 0, invalidInputs: invalidInputs };
+}
+/**
+ * Scrolls the matrix to the row of a question.
+ * @param {number} questionId - The ID of the question.
+ */
+function scrollToQuestion(questionId) {
+    const index = matrix.rowIndexes.get(questionId);
+    if (index !== undefined) {
+        $('#evaluation_matrix').closest('.vem-matrix-viewport').scrollTop(index * ROW_HEIGHT);
+        renderVisibleRows(false);
+    }
 }
 /**
  * Handles the submission of an evaluation.
@@ -360,12 +790,12 @@ function handleSubmitEvaluation($button, evaluationId) {
     }
 
     // Wait for any pending saves to complete
-    if (saveQueue.length > 0 || isProcessingQueue) {
+    if (saveQueue.size > 0 || isProcessingQueue) {
         alert('Please wait for all scores to be saved before submitting...');
 
         // Check again after 2 seconds
         setTimeout(function() {
-            if (saveQueue.length === 0 && !isProcessingQueue) {
+            if (saveQueue.size === 0 && !isProcessingQueue) {
                 handleSubmitEvaluation($button, evaluationId);
             }
         }, 2000);
@@ -386,7 +816,12 @@ function handleSubmitEvaluation($button, evaluationId) {
 
         // Focus on first invalid input
         if (scoreValidation.invalidInputs.length > 0) {
-            scoreValidation.invalidInputs[0].element.focus();
+            const invalid = scoreValidation.invalidInputs[0];
+            if (invalid.element.length) {
+                invalid.element.focus();
+            } else {
+                scrollToQuestion(invalid.questionId);
+            }
         }
 
         return;
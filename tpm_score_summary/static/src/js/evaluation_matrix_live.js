@@ -0,0 +1,32 @@
+/** @odoo-module **/
+
+import { registry } from "@web/core/registry";
+import { applyScoreDeltas } from "@tpm_score_summary/js/evaluation_matrix";
+
+/**
+ * Keeps an open evaluation matrix in sync with the scores saved by the other
+ * users viewing it.
+ * The service subscribes to the bus channel of the evaluation and patches
+ * the cells and totals from the published score deltas, so the page never
+ * needs to be reloaded to see the changes of others.
+ */
+export const evaluationMatrixLiveService = {
+    dependencies: ["bus_service"],
+    start(env, { bus_service }) {
+        const matrix = document.getElementById("evaluation_matrix");
+        const evaluationId = matrix && parseInt(matrix.dataset.evaluationId);
+
+        if (!evaluationId) {
+            return; // Not on evaluation matrix page
+        }
+
+        bus_service.addChannel("vem_evaluation_" + evaluationId);
+        bus_service.subscribe("vem.score_delta", function(payload) {
+            if (payload.evaluation_id === evaluationId) {
+                applyScoreDeltas(payload.cells);
+            }
+        });
+    },
+};
+
+registry.category("services").add("vem_evaluation_matrix_live", evaluationMatrixLiveService);
@@ -0,0 +1,128 @@
+/** @odoo-module **/
+
+/**
+ * Durable outbox of the score edits of the evaluation matrix.
+ * The edits are stored in IndexedDB until the server confirms them, keyed by
+ * evaluation, question and vendor, so repeated edits of a cell collapse into
+ * the latest one and closing the tab or losing the network does not lose
+ * them. When IndexedDB is not available (e.g. private browsing), the outbox
+ * silently does nothing and the edits only live in memory.
+ */
+const DB_NAME = 'tpm_score_summary';
+const DB_VERSION = 1;
+const STORE_NAME = 'score_outbox';
+
+let databasePromise = null;
+
+/**
+ * Opens the outbox database, creating it on first use.
+ * @returns {Promise} A promise resolved with the database, or null if
+ *                    IndexedDB is not available.
+ */
+function openDatabase() {
+    if (!databasePromise) {
+        databasePromise = new Promise(function(resolve) {
+            let request;
+            try {
+                request = window.indexedDB.open(DB_NAME, DB_VERSION);
+            } catch (error) {
+                console.warn('Score outbox unavailable:', error);
+                resolve(null);
+                return;
+            }
+            request.onupgradeneeded = function() {
+                const store = request.result.createObjectStore(STORE_NAME, { keyPath: 'key' });
+                store.createIndex('evaluationId', 'evaluationId');
+            };
+            request.onsuccess = function() {
+                resolve(request.result);
+            };
+            request.onerror = function() {
+                console.warn('Score outbox unavailable:', request.error);
+                resolve(null);
+            };
+        });
+    }
+    return databasePromise;
+}
+
+/**
+ * Runs a callback in a transaction on the outbox store.
+ * @param {string} mode - Either 'readonly' or 'readwrite'.
+ * @param {Function} callback - Receives the store and may return a request
+ *                              whose result is wanted.
+ * @returns {Promise} A promise resolved with the result of the request once
+ *                    the transaction is complete, or null on failure.
+ */
+function runTransaction(mode, callback) {
+    return openDatabase().then(function(database) {
+        if (!database) {
+            return null;
+        }
+        return new Promise(function(resolve, reject) {
+            const transaction = database.transaction(STORE_NAME, mode);
+            const request = callback(transaction.objectStore(STORE_NAME));
+            transaction.oncomplete = function() {
+                resolve(request ? request.result : null);
+            };
+            transaction.onerror = transaction.onabort = function() {
+                reject(transaction.error);
+            };
+        });
+    }).catch(function(error) {
+        console.warn('Score outbox operation failed:', error);
+        return null;
+    });
+}
+
+/**
+ * Returns the outbox key of a cell.
+ * @param {number} evaluationId - The ID of the evaluation.
+ * @param {number} questionId - The ID of the question.
+ * @param {number} vendorId - The ID of the vendor.
+ * @returns {string} The key.
+ */
+export function outboxKey(evaluationId, questionId, vendorId) {
+    return evaluationId + '_' + questionId + '_' + vendorId;
+}
+
+/**
+ * Stores an edit, replacing any previous edit of the same cell.
+ * @param {object} entry - The edit, with its key, evaluationId, questionId,
+ *                         vendorId, score, version and updatedAt.
+ * @returns {Promise} A promise resolved once the edit is stored.
+ */
+export function putEntry(entry) {
+    return runTransaction('readwrite', function(store) {
+        store.put(entry);
+    });
+}
+
+/**
+ * Removes an edit, unless the cell was edited again since.
+ * @param {object} entry - The edit to remove.
+ * @returns {Promise} A promise resolved once the edit is removed.
+ */
+export function deleteEntry(entry) {
+    return runTransaction('readwrite', function(store) {
+        const request = store.get(entry.key);
+        request.onsuccess = function() {
+            if (request.result && request.result.updatedAt === entry.updatedAt) {
+                store.delete(entry.key);
+            }
+        };
+    });
+}
+
+/**
+ * Returns the edits of an evaluation that were not confirmed yet.
+ * @param {number} evaluationId - The ID of the evaluation.
+ * @returns {Promise} A promise resolved with the list of edits.
+ */
+export function loadEntries(evaluationId) {
+    return runTransaction('readonly', function(store) {
+        return store.index('evaluationId').getAll(evaluationId);
+    }).then(function(entries) {
+        return entries || [];
+    });
+}
@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+
+from . import test_concurrency
+from . import test_performance
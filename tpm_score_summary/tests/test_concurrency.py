@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Concurrent saves of the same evaluation cell.
+
+Each test saves a cell from two transactions on their own database
+connections: the second save starts while the first transaction holds its
+locks, and the first transaction commits once the second one waits for them.
+The data is committed so both transactions see it, and removed afterwards.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+from odoo import SUPERUSER_ID, Command, api
+from odoo.sql_db import db_connect
+from odoo.tests import TransactionCase, tagged
+
+LOCK_TIMEOUT = 10  # seconds
+
+
+@tagged('post_install', '-at_install')
+class TestConcurrentScoreSaves(TransactionCase):
+
+    def setUp(self):
+        super().setUp()
+        self.question_id = self.vendor_id = self.evaluation_id = None
+        # Registered before anything is committed, so the committed rows are
+        # removed even if the rest of the setup fails
+        self.addCleanup(self._cleanup)
+        with self._cursor() as env:
+            self.question_id = env['vem.eval.question'].create({'name': 'Concurrency question', 'weight': 2}).id
+            self.vendor_id = env['vem.vendor'].create({'name': 'Concurrency team'}).id
+            self.evaluation_id = env['vem.evaluation'].create({
+                'evaluator_name': 'Concurrency evaluator',
+                'vendor_ids': [Command.set([self.vendor_id])],
+            }).id
+            env.cr.commit()
+
+    def _cleanup(self):
+        with self._cursor() as env:
+            # Lines and totals are removed with their evaluation
+            env['vem.evaluation'].browse(self.evaluation_id).exists().unlink()
+            env['vem.eval.question'].browse(self.question_id).exists().unlink()
+            env['vem.vendor'].browse(self.vendor_id).exists().unlink()
+            env.cr.commit()
+
+    @contextmanager
+    def _cursor(self):
+        """
+        Opens a READ COMMITTED transaction on a new database connection.
+        Yields:
+            odoo.api.Environment: A superuser environment on the transaction,
+                                  rolled back unless committed.
+        """
+        cr = db_connect(self.env.cr.dbname).cursor()
+        try:
+            cr.execute("SET TRANSACTION ISOLATION LEVEL READ COMMITTED")
+            yield api.Environment(cr, SUPERUSER_ID, {})
+        finally:
+            cr.close()
+
+    def _upsert(self, env, cells):
+        evaluation = env['vem.evaluation'].browse(self.evaluation_id)
+        return env['vem.evaluation.line']._upsert_scores(evaluation, cells)
+
+    def _wait_for_lock(self, pid):
+        """
+        Waits until a database backend waits for a lock.
+        Args:
+            pid (int): The process ID of the backend.
+        """
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            with self._cursor() as env:
+                env.cr.execute("SELECT wait_event_type FROM pg_stat_activity WHERE pid = %s", [pid])
+                row = env.cr.fetchone()
+            if row and row[0] == 'Lock':
+                return
+            time.sleep(0.05)
+        self.fail("The second save did not wait for the first one")
+
+    def _save_concurrently(self, first_cells, second_cells):
+        """
+        Saves cells from two interleaved transactions.
+        Args:
+            first_cells (list): The cells saved by the first transaction.
+            second_cells (list): The cells saved by the second transaction,
+                                 while the first one is not committed yet.
+        Returns:
+            tuple: The results of `_upsert_scores` in both transactions.
+        """
+        results = {}
+        started = threading.Event()
+
+        def second_save():
+            try:
+                with self._cursor() as env:
+                    env.cr.execute("SELECT pg_backend_pid()")
+                    results['pid'] = env.cr.fetchone()[0]
+                    started.set()
+                    results['second'] = self._upsert(env, second_cells)
+                    env.cr.commit()
+            except Exception as e:
+                results['error'] = e
+            finally:
+                started.set()
+
+        with self._cursor() as env:
+            results['first'] = self._upsert(env, first_cells)
+            thread = threading.Thread(target=second_save)
+            thread.start()
+            started.wait(LOCK_TIMEOUT)
+            if 'pid' in results:
+                self._wait_for_lock(results['pid'])
+            env.cr.commit()
+
+        thread.join(LOCK_TIMEOUT)
+        self.assertFalse(thread.is_alive(), "The second save did not finish")
+        if 'error' in results:
+            raise results['error']
+        return results['first'], results['second']
+
+    def _read_line(self):
+        with self._cursor() as env:
+            env.cr.execute("""
+                SELECT score, version
+                  FROM vem_evaluation_line
+                 WHERE evaluation_id = %s AND question_id = %s AND vendor_id = %s
+            """, [self.evaluation_id, self.question_id, self.vendor_id])
+            return env.cr.fetchone()
+
+    def assertTotalsConsistent(self):
+        """
+        Checks that the running totals of the evaluation match its lines.
+        """
+        with self._cursor() as env:
+            env.cr.execute("""
+                  SELECT total.total_score, total.line_count, total.weighted_score, total.max_score,
+                         SUM(line.score), COUNT(line.id),
+                         SUM(line.score * question.weight), SUM(question.weight) * 5
+                    FROM vem_evaluation_total total
+                    JOIN vem_evaluation_line line ON line.evaluation_id = total.evaluation_id
+                                                 AND line.vendor_id = total.vendor_id
+                    JOIN vem_eval_question question ON question.id = line.question_id
+                   WHERE total.evaluation_id = %s
+                GROUP BY total.id
+            """, [self.evaluation_id])
+            rows = env.cr.fetchall()
+        self.assertTrue(rows)
+        for row in rows:
+            self.assertEqual(row[:4], row[4:], "The running totals drifted from the lines")
+
+    def test_concurrent_first_saves(self):
+        cell = (self.question_id, self.vendor_id)
+        (first, __), (second, __) = self._save_concurrently([(*cell, 3)], [(*cell, 5)])
+        self.assertEqual(len(first), 1)
+        self.assertEqual(len(second), 1)
+        self.assertEqual(self._read_line(), (5, 2))
+        self.assertTotalsConsistent()
+
+    def test_concurrent_updates(self):
+        cell = (self.question_id, self.vendor_id)
+        with self._cursor() as env:
+            self._upsert(env, [(*cell, 1)])
+            env.cr.commit()
+        self._save_concurrently([(*cell, 4)], [(*cell, 2)])
+        self.assertEqual(self._read_line(), (2, 3))
+        self.assertTotalsConsistent()
+
+    def test_concurrent_versioned_saves(self):
+        cell = (self.question_id, self.vendor_id)
+        with self._cursor() as env:
+            ((__, __, __, __, version),), __ = self._upsert(env, [(*cell, 1)])
+            env.cr.commit()
+        (first, __), (second, __) = self._save_concurrently([(*cell, 4, version)], [(*cell, 2, version)])
+        self.assertEqual(len(first), 1)
+        self.assertFalse(second, "The second save overwrote the first one")
+        self.assertEqual(self._read_line(), (4, version + 1))
+        self.assertTotalsConsistent()
+
+    def test_unchanged_score_keeps_version(self):
+        cell = (self.question_id, self.vendor_id)
+        with self._cursor() as env:
+            ((__, __, __, __, version),), __ = self._upsert(env, [(*cell, 3)])
+            ((__, __, __, __, same_version),), __ = self._upsert(env, [(*cell, 3, version)])
+            line = env['vem.evaluation.line'].search([
+                ('evaluation_id', '=', self.evaluation_id), ('question_id', '=', self.question_id),
+            ])
+            line.score = 3
+            self.assertEqual(same_version, version)
+            self.assertEqual(line.version, version)
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks of the evaluation workflow on synthetic data.
+
+The benchmarks are excluded from the standard test run. Run them with
+`--test-tags /tpm_score_summary:perf`. The size of the dataset can be changed
+with the `VEM_PERF_EVALUATIONS`, `VEM_PERF_QUESTIONS` and `VEM_PERF_TEAMS`
+environment variables.
+
+Each benchmark times an operation and counts its SQL queries, then checks
+them against the regression thresholds of `perf_thresholds.json`. The query
+counts do not depend on the size of the dataset and are always checked. The
+timings are only checked on the default dataset the thresholds were set for.
+"""
+
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from unittest.mock import patch
+
+from odoo import Command
+from odoo.tests import HttpCase, new_test_user, tagged
+from odoo.tools.misc import file_path
+
+from ..models.evaluation import _summary_cache
+from ..models.rate_limit import VendorEvalRateLimit
+
+_logger = logging.getLogger(__name__)
+
+with open(file_path('tpm_score_summary/tests/perf_thresholds.json')) as thresholds_file:
+    PERF_CONFIG = json.load(thresholds_file)
+
+
+def _dataset_size(name):
+    """
+    Returns the configured size of a dimension of the dataset.
+    Args:
+        name (str): The dimension, i.e. 'evaluations', 'questions' or
+                    'teams'.
+    Returns:
+        int: The value of the `VEM_PERF_<NAME>` environment variable, or the
+             default size of `perf_thresholds.json`.
+    """
+    return int(os.environ.get(f'VEM_PERF_{name.upper()}', PERF_CONFIG['dataset'][name]))
+
+
+@tagged('-standard', 'perf', 'post_install', '-at_install')
+class TestEvaluationPerformance(HttpCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # The limiter commits its buckets on its own connection, outside the
+        # test transaction: keep it out of the benchmarks
+        cls.startClassPatcher(patch.object(VendorEvalRateLimit, '_consume', return_value=True))
+        cls.dataset = {name: _dataset_size(name) for name in PERF_CONFIG['dataset']}
+        cls.default_dataset = cls.dataset == PERF_CONFIG['dataset']
+
+        cls.user = new_test_user(cls.env, login='vem_perf_manager',
+                                 groups='base.group_user,tpm_score_summary.group_vem_manager')
+        cls.env['vem.eval.question'].search([]).active = False
+        cls.questions = cls.env['vem.eval.question'].create([
+            {'name': f'Question {index}', 'sequence': index}
+            for index in range(cls.dataset['questions'])
+        ])
+        cls.vendors = cls.env['vem.vendor'].create([
+            {'name': f'Team {index}'}
+            for index in range(cls.dataset['teams'])
+        ])
+        cls.evaluations = cls.env['vem.evaluation']._create_campaign(
+            [f'Evaluator {index}' for index in range(cls.dataset['evaluations'])],
+            cls.vendors, cls.questions).with_user(cls.user)
+        _logger.info("Benchmark dataset: %s", cls.dataset)
+
+    @contextmanager
+    def assertPerformance(self, name):
+        """
+        Times the enclosed block and counts its SQL queries.
+        Pending ORM writes are flushed before and after the block, so the
+        queries it triggers are counted in full.
+        Args:
+            name (str): The name of the benchmark in `perf_thresholds.json`.
+        """
+        thresholds = PERF_CONFIG['thresholds'][name]
+        self.env.flush_all()
+        query_count = self.cr.sql_log_count
+        start = time.perf_counter()
+        yield
+        self.env.flush_all()
+        elapsed = time.perf_counter() - start
+        query_count = self.cr.sql_log_count - query_count
+
+        _logger.info("Benchmark %s: %.3fs, %s queries", name, elapsed, query_count)
+        self.assertLessEqual(query_count, thresholds['queries'],
+                             f"{name} runs more queries than its threshold")
+        if self.default_dataset:
+            self.assertLessEqual(elapsed, thresholds['seconds'],
+                                 f"{name} is slower than its threshold")
+
+    def test_rebuild_totals(self):
+        with self.assertPerformance('rebuild_totals'):
+            self.env['vem.evaluation.total']._rebuild(self.evaluations.ids)
+        self.assertEqual(len(self.evaluations.total_ids), len(self.evaluations) * len(self.vendors))
+
+    def test_create_evaluation_lines(self):
+        evaluations = self.env['vem.evaluation'].with_user(self.user).create([{
+            'evaluator_name': f'New evaluator {index}',
+            'vendor_ids': [Command.set(self.vendors.ids)],
+        } for index in range(self.dataset['evaluations'])])
+        with self.assertPerformance('create_evaluation_lines'):
+            evaluations._create_evaluation_lines()
+        self.assertEqual(len(evaluations.line_ids),
+                         len(evaluations) * len(self.questions) * len(self.vendors))
+
+    def test_save_evaluation_score(self):
+        self.authenticate(self.user.login, self.user.login)
+        evaluation = self.evaluations[0]
+        route = f'/vem/eval/{evaluation.id}/save'
+        params = {'question_id': self.questions[0].id, 'vendor_id': self.vendors[0].id, 'score': 4}
+        self.make_jsonrpc_request(route, params)
+        params['score'] = 5
+        with self.assertPerformance('save_evaluation_score'):
+            result = self.make_jsonrpc_request(route, params)
+        self.assertTrue(result['success'], result.get('error'))
+
+    def test_save_scores(self):
+        evaluation = self.evaluations[-1]
+        cells = [
+            {'question_id': question.id, 'vendor_id': vendor.id, 'score': 3}
+            for question in self.questions
+            for vendor in self.vendors
+        ]
+        service = self.env['vem.score.service'].with_user(self.user)
+        with self.assertPerformance('save_scores'):
+            result = service._save_scores(evaluation.id, cells)
+        self.assertTrue(result['success'], result.get('error'))
+        self.assertEqual(len(result['lines']), len(cells))
+
+    def test_evaluation_matrix(self):
+        self.authenticate(self.user.login, self.user.login)
+        route = f'/vem/eval/{self.evaluations[0].id}'
+        # The first rendering compiles the template
+        self.url_open(route)
+        with self.assertPerformance('evaluation_matrix'):
+            response = self.url_open(route)
+        self.assertEqual(response.status_code, 200)
+
+    def test_get_multi_evaluation_summary(self):
+        _summary_cache.clear()
+        with self.assertPerformance('get_multi_evaluation_summary'):
+            summary = self.env['vem.evaluation'].with_user(self.user).get_multi_evaluation_summary(
+                self.evaluations.ids)
+        self.assertEqual(len(summary['evaluations']), len(self.evaluations))
@@ -0,0 +1,5 @@
+# -*- coding: utf-8 -*-
+
+from . import score_stats
+from . import summary_export
+from . import route_metrics
@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""
+Per-route timing and SQL instrumentation of the evaluation controllers.
+
+Each instrumented route records its wall time, its number of SQL queries and
+the time spent in them. The SQL figures are read from the counters Odoo
+already maintains on the request thread, so recording a request costs a few
+additions under a lock. The measures are aggregated in memory, per worker
+process, into histograms with fixed buckets, and logged periodically as one
+JSON line per route.
+
+The instrumentation is enabled by default and can be disabled with the
+`vem_route_metrics = False` option of the server configuration file.
+"""
+
+import bisect
+import functools
+import json
+import logging
+import threading
+import time
+
+from odoo.tools import config, str2bool
+
+_logger = logging.getLogger(__name__)
+
+# Upper bounds of the histogram buckets, the last bucket is unbounded
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # seconds
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+LOG_INTERVAL = 300  # seconds between two metrics log lines
+
+_lock = threading.Lock()
+_metrics = {}
+_last_log = time.monotonic()
+
+
+def _new_metric():
+    """
+    Returns the empty aggregates of a route.
+    """
+    return {
+        'count': 0,
+        'errors': 0,
+        'wall_time': 0.0,
+        'wall_time_max': 0.0,
+        'wall_time_buckets': [0] * (len(TIME_BUCKETS) + 1),
+        'sql_count': 0,
+        'sql_count_max': 0,
+        'sql_count_buckets': [0] * (len(QUERY_BUCKETS) + 1),
+        'sql_time': 0.0,
+    }
+
+
+def record(route, wall_time, sql_count, sql_time, error=False):
+    """
+    Adds the measures of one request to the aggregates of its route.
+    Args:
+        route (str): The name of the route.
+        wall_time (float): The duration of the request in seconds.
+        sql_count (int): The number of SQL queries run by the request.
+        sql_time (float): The time spent in SQL queries in seconds.
+        error (bool): Whether the request failed.
+    """
+    global _last_log
+    with _lock:
+        metric = _metrics.get(route)
+        if metric is None:
+            metric = _metrics[route] = _new_metric()
+        metric['count'] += 1
+        metric['errors'] += bool(error)
+        metric['wall_time'] += wall_time
+        metric['wall_time_max'] = max(metric['wall_time_max'], wall_time)
+        metric['wall_time_buckets'][bisect.bisect_left(TIME_BUCKETS, wall_time)] += 1
+        metric['sql_count'] += sql_count
+        metric['sql_count_max'] = max(metric['sql_count_max'], sql_count)
+        metric['sql_count_buckets'][bisect.bisect_left(QUERY_BUCKETS, sql_count)] += 1
+        metric['sql_time'] += sql_time
+
+        now = time.monotonic()
+        if now - _last_log < LOG_INTERVAL:
+            return
+        _last_log = now
+        lines = [json.dumps({'route': name, **summarize(values)}) for name, values in _metrics.items()]
+
+    for line in lines:
+        _logger.info("vem.route_metrics %s", line)
+
+
+def summarize(metric):
+    """
+    Computes the averages of the aggregates of a route.
+    Args:
+        metric (dict): The aggregates of the route.
+    Returns:
+        dict: The number of requests and errors, the average and max wall
+              time and SQL query count, and the average SQL time, with the
+              times in milliseconds.
+    """
+    count = metric['count'] or 1
+    return {
+        'count': metric['count'],
+        'errors': metric['errors'],
+        'wall_time_avg_ms': round(metric['wall_time'] / count * 1000, 2),
+        'wall_time_max_ms': round(metric['wall_time_max'] * 1000, 2),
+        'sql_count_avg': round(metric['sql_count'] / count, 2),
+        'sql_count_max': metric['sql_count_max'],
+        'sql_time_avg_ms': round(metric['sql_time'] / count * 1000, 2),
+    }
+
+
+def snapshot():
+    """
+    Returns the metrics of all the routes recorded by this process.
+    Returns:
+        dict: A dictionary containing the histogram bucket bounds and, per
+              route, the summary of `summarize` along with the histograms of
+              the wall time and of the SQL query count.
+    """
+    with _lock:
+        routes = {
+            route: {
+                **summarize(metric),
+                'wall_time_buckets': list(metric['wall_time_buckets']),
+                'sql_count_buckets': list(metric['sql_count_buckets']),
+            }
+            for route, metric in _metrics.items()
+        }
+    return {
+        'time_buckets': list(TIME_BUCKETS),
+        'query_buckets': list(QUERY_BUCKETS),
+        'routes': routes,
+    }
+
+
+def reset():
+    """
+    Discards the metrics recorded by this process.
+    """
+    with _lock:
+        _metrics.clear()
+
+
+def is_enabled():
+    """
+    Returns whether the routes are instrumented.
+    Returns:
+        bool: The `vem_route_metrics` server option, True by default.
+    """
+    return str2bool(str(config.get('vem_route_metrics', True)), True)
+
+
+def _is_error(result):
+    """
+    Returns whether the result of a controller method reports a failure.
+    Args:
+        result: The JSON result or the HTTP response of the method.
+    Returns:
+        bool: True for a JSON result whose `success` is False, or an HTTP
+              response with a 4xx or 5xx status.
+    """
+    if isinstance(result, dict):
+        return result.get('success') is False
+    return getattr(result, 'status_code', 200) >= 400
+
+
+def instrumented(route):
+    """
+    Decorates a controller method so its requests are recorded.
+    The SQL figures are the differences of the `query_count` and
+    `query_time` counters Odoo keeps on the thread serving the request.
+    Lazy QWeb responses are rendered by the wrapper, so the measures include
+    the rendering of the page. Requests raising an exception, answered with
+    an error status or returning `success: False` are counted as errors.
+    Args:
+        route (str): The name under which the requests are recorded.
+    Returns:
+        callable: The decorator.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            if not is_enabled():
+                return method(*args, **kwargs)
+            thread = threading.current_thread()
+            sql_count = getattr(thread, 'query_count', 0)
+            sql_time = getattr(thread, 'query_time', 0.0)
+            start = time.perf_counter()
+            error = True
+            try:
+                result = method(*args, **kwargs)
+                if getattr(result, 'is_qweb', False):
+                    result.flatten()
+                error = _is_error(result)
+                return result
+            finally:
+                record(
+                    route,
+                    time.perf_counter() - start,
+                    getattr(thread, 'query_count', 0) - sql_count,
+                    getattr(thread, 'query_time', 0.0) - sql_time,
+                    error,
+                )
+        return wrapper
+    return decorator
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+Vectorized statistics over a score cube.
+
+A score cube is a float array of shape (evaluations, questions, teams)
+holding the score given by each evaluation to each team for each question,
+with NaN where no score exists (see `vem.evaluation._get_score_cube`). All
+the functions of this module work on whole arrays, without any Python loop
+over evaluations, questions or teams.
+"""
+
+import warnings
+
+import numpy as np
+
+
+def evaluator_totals(cube):
+    """
+    Computes the total score given by each evaluation to each team.
+    Args:
+        cube (numpy.ndarray): The (evaluations, questions, teams) score cube.
+    Returns:
+        numpy.ndarray: An (evaluations, teams) array of totals, with NaN when
+                       the evaluation did not score the team at all.
+    """
+    totals = np.nansum(cube, axis=1)
+    totals[np.isnan(cube).all(axis=1)] = np.nan
+    return totals
+
+
+def competition_ranks(values):
+    """
+    Ranks values in descending order, giving tied values the same rank.
+    Tied values share the best rank of their group, and the following rank
+    is skipped ("1224" ranking). NaN values are not ranked.
+    Args:
+        values (numpy.ndarray): A 1-D array of values.
+    Returns:
+        numpy.ndarray: The rank of each value, with NaN for NaN values.
+    """
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, -np.inf)
+    ranks = 1.0 + (filled[None, :] > filled[:, None]).sum(axis=1)
+    ranks[~valid] = np.nan
+    return ranks
+
+
+def average_ranks(values):
+    """
+    Ranks each row of a 2-D array in ascending order, averaging ties.
+    Args:
+        values (numpy.ndarray): An (raters, items) array without NaN.
+    Returns:
+        tuple: The (raters, items) array of ranks, and the tie correction
+               sum(t^3 - t) over the tie groups of each row.
+    """
+    lower = (values[:, None, :] < values[:, :, None]).sum(axis=2)
+    equal = (values[:, None, :] == values[:, :, None]).sum(axis=2)
+    ranks = lower + (equal + 1) / 2.0
+    # Each member of a group of t ties has t - 1 equal peers, so summing
+    # t^2 - 1 over the members yields t^3 - t for the group
+    tie_correction = (equal ** 2 - 1).sum(axis=1)
+    return ranks, tie_correction
+
+
+def kendall_w(totals):
+    """
+    Computes Kendall's coefficient of concordance between evaluators.
+    Each evaluation is a rater ranking the teams by their total score. Only
+    the evaluations that scored at least one team and the teams scored by
+    all of them are taken into account, and ties are corrected for.
+    Args:
+        totals (numpy.ndarray): An (evaluations, teams) array of totals, with
+                                NaN for teams not scored by an evaluation.
+    Returns:
+        float: The coefficient, from 0 (no agreement) to 1 (complete
+               agreement), or None when fewer than two evaluations or two
+               common teams are available.
+    """
+    totals = totals[~np.isnan(totals).all(axis=1)]
+    complete = totals[:, ~np.isnan(totals).any(axis=0)]
+    raters, items = complete.shape
+    if raters < 2 or items < 2:
+        return None
+
+    ranks, tie_correction = average_ranks(complete)
+    rank_sums = ranks.sum(axis=0)
+    spread = ((rank_sums - rank_sums.mean()) ** 2).sum()
+    denominator = raters ** 2 * (items ** 3 - items) - raters * tie_correction.sum()
+    if denominator <= 0:
+        return None
+    return float(12 * spread / denominator)
+
+
+def summarize(cube):
+    """
+    Computes the statistics of a score cube.
+    Args:
+        cube (numpy.ndarray): The (evaluations, questions, teams) score cube.
+    Returns:
+        dict: A dictionary of arrays containing, per team, the number of
+              evaluations that scored it and the mean, median, standard
+              deviation, min, max and total of their totals along with the
+              rank of the team; per question and team, the min and max
+              score; and Kendall's W between the evaluators.
+    """
+    totals = evaluator_totals(cube)
+    counts = (~np.isnan(totals)).sum(axis=0)
+    team_sums = np.nansum(totals, axis=0)
+
+    scored = ~np.isnan(cube)
+    question_min = np.where(scored, cube, np.inf).min(axis=0, initial=np.inf)
+    question_max = np.where(scored, cube, -np.inf).max(axis=0, initial=-np.inf)
+    question_min[~scored.any(axis=0)] = np.nan
+    question_max[~scored.any(axis=0)] = np.nan
+
+    # Teams without any score legitimately yield NaN statistics
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        team_mean = np.nanmean(totals, axis=0)
+        team_median = np.nanmedian(totals, axis=0)
+        team_std = np.nanstd(totals, axis=0)
+        team_min = np.nanmin(totals, axis=0)
+        team_max = np.nanmax(totals, axis=0)
+
+    return {
+        'team_count': counts,
+        'team_total': team_sums,
+        'team_mean': team_mean,
+        'team_median': team_median,
+        'team_std': team_std,
+        'team_min': team_min,
+        'team_max': team_max,
+        'team_rank': competition_ranks(np.where(counts > 0, team_sums, np.nan)),
+        'question_min': question_min,
+        'question_max': question_max,
+        'kendall_w': kendall_w(totals),
+    }
+
+
+def to_json(value, digits=2):
+    """
+    Converts statistics to JSON-serializable values.
+    Arrays become nested lists, floats are rounded and NaN becomes None.
+    Args:
+        value: A statistics value, array or dictionary of them.
+        digits (int): The number of decimals to keep.
+    Returns:
+        The JSON-serializable value.
+    """
+    if isinstance(value, dict):
+        return {key: to_json(item, digits) for key, item in value.items()}
+    if isinstance(value, np.ndarray) and np.issubdtype(value.dtype, np.integer):
+        return value.tolist()
+    if isinstance(value, np.ndarray):
+        rounded = np.round(value.astype(float), digits).astype(object)
+        rounded[np.isnan(value.astype(float))] = None
+        return rounded.tolist()
+    if isinstance(value, float):
+        return None if np.isnan(value) else round(value, digits)
+    return value
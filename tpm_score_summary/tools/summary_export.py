@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming export of multi-evaluation summaries.
+
+The rows are read through a PostgreSQL server-side cursor and written to the
+response by generators, so exporting hundreds of thousands of evaluation
+lines neither loads records nor keeps the whole file in memory.
+"""
+
+import csv
+import io
+import tempfile
+
+import xlsxwriter
+
+HEADER = ['Evaluation', 'Evaluator', 'Question', 'Team', 'Score']
+FETCH_SIZE = 2000  # rows fetched from the server-side cursor at once
+CHUNK_SIZE = 64 * 1024  # bytes
+
+
+def iter_summary_rows(cr, evaluation_ids):
+    """
+    Yields the (evaluation, evaluator, question, team, score) rows of the
+    evaluations, in evaluation, question and team order.
+    Args:
+        cr (odoo.sql_db.Cursor): The cursor used to declare the server-side
+                                 cursor. It must stay open while iterating.
+        evaluation_ids (list): The IDs of the evaluations to export.
+    Yields:
+        tuple: One row per evaluation line.
+    """
+    cr.execute("""
+        DECLARE vem_summary_export NO SCROLL CURSOR FOR
+         SELECT evaluation.name, evaluation.evaluator_name, question.name, vendor.name, line.score
+           FROM vem_evaluation_line line
+           JOIN vem_evaluation evaluation ON evaluation.id = line.evaluation_id
+           JOIN vem_eval_question question ON question.id = line.question_id
+           JOIN vem_vendor vendor ON vendor.id = line.vendor_id
+          WHERE line.evaluation_id = ANY(%s)
+       ORDER BY evaluation.id, question.sequence, question.id, vendor.name, vendor.id
+    """, [list(evaluation_ids)])
+    try:
+        while True:
+            cr.execute("FETCH FORWARD %s FROM vem_summary_export", [FETCH_SIZE])
+            rows = cr.fetchall()
+            if not rows:
+                break
+            yield from rows
+    finally:
+        cr.execute("CLOSE vem_summary_export")
+
+
+def stream_csv(rows):
+    """
+    Writes rows as UTF-8 CSV, in chunks.
+    A byte order mark is written first so spreadsheet applications detect
+    the encoding of the Japanese and Vietnamese labels.
+    Args:
+        rows (iterable): The rows to write, without header.
+    Yields:
+        bytes: The CSV content.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')
+    writer.writerow(HEADER)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def stream_xlsx(rows):
+    """
+    Writes rows as an XLSX workbook, in chunks.
+    The workbook is built in constant-memory mode, which flushes each row to
+    a temporary file as soon as it is written. An XLSX file is a zip archive
+    that is only complete once closed, so the content is streamed from the
+    temporary file after the last row.
+    Args:
+        rows (iterable): The rows to write, without header.
+    Yields:
+        bytes: The XLSX content.
+    """
+    with tempfile.TemporaryFile() as output:
+        workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+        worksheet = workbook.add_worksheet('Summary')
+        bold = workbook.add_format({'bold': True})
+        worksheet.write_row(0, 0, HEADER, bold)
+        for index, row in enumerate(rows, start=1):
+            worksheet.write_row(index, 0, row)
+        workbook.close()
+
+        output.seek(0)
+        while True:
+            chunk = output.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+
+
+class VendorEvalCampaign(models.TransientModel):
+    """
+    Wizard launching an evaluation campaign.
+    It creates one evaluation per evaluator, scoring the selected teams on
+    all the active questions, with all the evaluation lines ready to be
+    filled in.
+    """
+    _name = 'vem.evaluation.campaign'
+    _description = 'Evaluation Campaign'
+
+    evaluator_names = fields.Text(
+        string='Evaluators',
+        required=True,
+        help='Names of the evaluators, one per line'
+    )
+    vendor_ids = fields.Many2many(
+        'vem.vendor',
+        string='Teams',
+        required=True,
+        help='The teams evaluated by every evaluator'
+    )
+    evaluation_count = fields.Integer(
+        string='Evaluations',
+        compute='_compute_counts'
+    )
+    line_count = fields.Integer(
+        string='Evaluation Lines',
+        compute='_compute_counts'
+    )
+
+    @api.depends('evaluator_names', 'vendor_ids')
+    def _compute_counts(self):
+        """
+        Computes the number of evaluations and evaluation lines the campaign
+        will create.
+        """
+        question_count = self.env['vem.eval.question'].search_count([('active', '=', True)])
+        for campaign in self:
+            campaign.evaluation_count = len(campaign._get_evaluator_names())
+            campaign.line_count = campaign.evaluation_count * len(campaign.vendor_ids) * question_count
+
+    def _get_evaluator_names(self):
+        """
+        Returns the evaluator names entered in the wizard.
+        Returns:
+            list: The non-empty lines of `evaluator_names`, stripped.
+        """
+        self.ensure_one()
+        return [name.strip() for name in (self.evaluator_names or '').splitlines() if name.strip()]
+
+    def action_generate(self):
+        """
+        Creates the evaluations of the campaign and opens them.
+        Returns:
+            dict: An action opening the list of the created evaluations.
+        """
+        self.ensure_one()
+        evaluator_names = self._get_evaluator_names()
+        if not evaluator_names:
+            raise UserError("Please enter at least one evaluator.")
+        if not self.vendor_ids:
+            raise UserError("Please select at least one team.")
+
+        evaluations = self.env['vem.evaluation']._create_campaign(evaluator_names, self.vendor_ids)
+        return {
+            'type': 'ir.actions.act_window',
+            'name': 'Campaign Evaluations',
+            'res_model': 'vem.evaluation',
+            'view_mode': 'list,form',
+            'domain': [('id', 'in', evaluations.ids)],
+        }